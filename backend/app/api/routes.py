@@ -1,30 +1,232 @@
 """FastAPI route definitions."""
 
+import asyncio
+import functools
 import logging
-from typing import Any
-
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Annotated, Any, Callable, Dict, Iterator, Optional
+
+import orjson
+import pydicom
+from fastapi import APIRouter, File, Header, HTTPException, Query, Response, UploadFile
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from typing import List
 
 logger = logging.getLogger(__name__)
 
 from backend.app.config import get_settings
-from backend.app.dependencies import (
-    get_kheops_service,
-    get_report_generator,
+from backend.app.utils.cache import TTLCache
+from backend.app.utils.dicom_utils import (
+    METADATA_DEFER_SIZE,
+    combine_content_digests,
+    content_digests,
+    looks_like_dicom,
 )
+from backend.app.dependencies import KheopsServiceDep, ReportGeneratorDep
 from backend.app.models.schemas import (
     HealthResponse,
     StudiesResponse,
     SeriesListResponse,
     ReportResponse,
     InferenceFromKheopsRequest,
-    StudyResponse,
-    SeriesResponse,
 )
 
 router = APIRouter(prefix="/api", tags=["api"])
 
+_settings = get_settings()
+
+# Kheops availability and upload limits are fixed for the lifetime of the process
+_KHEOPS_ENABLED = _settings.enable_kheops
+_MAX_DICOM_FILE_BYTES = _settings.max_dicom_file_mb * 1024 * 1024
+_MAX_SERIES_FILES = _settings.max_series_files
+
+# Caps concurrent report generation so parallel uploads queue for the
+# model/GPU instead of thrashing it
+_inference_slots = asyncio.Semaphore(_settings.max_concurrent_inferences)
+
+# Serialized reports keyed by upload content hash, so retries and repeated
+# demo uploads skip inference entirely
+_report_cache = TTLCache(maxsize=_settings.report_cache_size, ttl=_settings.report_cache_ttl_seconds)
+_KHEOPS_DISABLED_DETAIL = (
+    "Kheops integration is disabled for PoC. Please use /api/inference/from-dicom with local file upload."
+)
+_KHEOPS_DISABLED_BODY = orjson.dumps({"detail": _KHEOPS_DISABLED_DETAIL})
+
+# Listings longer than this are streamed instead of serialized in one go
+_STREAM_LISTING_THRESHOLD = 100
+
+# Bytes needed to see the Part-10 "DICM" signature at offset 128
+DICOM_PREAMBLE_SIZE = 132
+
+
+def _is_zip_upload(upload: UploadFile) -> bool:
+    """Check whether an upload is a ZIP archive (KHEOPS exports are often ZIP)."""
+    return bool(upload.filename) and upload.filename.lower().endswith(".zip")
+
+
+def _truncate(text: str, max_length: int = 30) -> str:
+    """Shorten text to max_length characters, marking the cut with "..."."""
+    return text if len(text) <= max_length else text[:max_length] + "..."
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check whether an If-None-Match header lists etag (or "*"); weak tags match too."""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _internal_errors(message: str) -> Callable:
+    """
+    Turn unexpected exceptions raised by a route into a logged 500 response.
+
+    HTTPExceptions pass through untouched. Anything else is logged once with
+    its traceback and reported to the client as error type and message only.
+
+    Args:
+        message: Prefix for the client-facing error message
+
+    Returns:
+        Route decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            try:
+                return await func(*args, **kwargs)
+            except HTTPException:
+                raise
+            except Exception as e:
+                error_type = type(e).__name__
+                logger.error("%s: %s: %s", message, error_type, e, exc_info=True)
+                raise HTTPException(
+                    status_code=500,
+                    detail={"error": f"{message}: {e}", "type": error_type},
+                ) from e
+        return wrapper
+    return decorator
+
+
+def _report_payload(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the ReportResponse body straight from report generator output.
+
+    ClinicalReport and DiagnosisResult share their field names with
+    ClinicalReportResponse and DiagnosisResponse, and orjson serializes
+    dataclasses natively, so the domain objects are passed through as-is.
+    The payload is returned as a raw response, so FastAPI skips the
+    response_model validation pass.
+
+    Args:
+        result: Dictionary with report, diagnosis and dicom_metadata
+
+    Returns:
+        orjson-serializable report payload
+    """
+    return {
+        "report": result["report"],
+        "diagnosis": result["diagnosis"],
+        "dicom_metadata": result["dicom_metadata"],
+    }
+
+
+def _iter_json_list(key: str, items: List[Any]) -> Iterator[bytes]:
+    """
+    Serialize ``{key: items}`` as JSON incrementally.
+
+    Items are emitted in chunks of _STREAM_LISTING_THRESHOLD so the full
+    document is never held in memory at once.
+
+    Args:
+        key: Name of the list field
+        items: orjson-serializable items
+
+    Yields:
+        Chunks of the JSON document
+    """
+    yield b'{"' + key.encode() + b'":['
+    for start in range(0, len(items), _STREAM_LISTING_THRESHOLD):
+        chunk = b",".join(orjson.dumps(item) for item in items[start:start + _STREAM_LISTING_THRESHOLD])
+        yield chunk if start == 0 else b"," + chunk
+    yield b"]}"
+
+
+async def _peek_header(upload: UploadFile) -> bytes:
+    """
+    Read the DICOM preamble of an upload and rewind it.
+
+    Args:
+        upload: Uploaded file
+
+    Returns:
+        First DICOM_PREAMBLE_SIZE bytes of the upload
+    """
+    header = await upload.read(DICOM_PREAMBLE_SIZE)
+    await upload.seek(0)
+    return header
+
+
+def _extract_zip_upload(upload: UploadFile, dest: Path, max_files: int) -> List[Path]:
+    """
+    Extract the DICOM members of an uploaded ZIP archive.
+
+    The archive is read straight from the spooled upload (no in-memory copy),
+    and declared member sizes are checked first so a ZIP bomb never hits the
+    disk. Each member is then decompressed once: its preamble is checked on
+    the fly and only DICOM members are written out.
+
+    Args:
+        upload: Uploaded ZIP archive, rewound to the start
+        dest: Directory to extract into
+        max_files: Number of DICOM files the archive may still contribute
+            (non-DICOM members don't count)
+
+    Returns:
+        Paths of the extracted DICOM files, in archive order
+
+    Raises:
+        HTTPException: 413 if the archive has too many DICOM members or too
+            large members
+    """
+    dicom_paths = []
+    with zipfile.ZipFile(upload.file, 'r') as zip_ref:
+        members = [m for m in zip_ref.infolist() if not m.is_dir()]
+        logger.info("Found %d files in ZIP archive", len(members))
+        oversized = next((m for m in members if m.file_size > _MAX_DICOM_FILE_BYTES), None)
+        if oversized is not None:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File {oversized.filename} in {upload.filename} too large. "
+                       f"Maximum DICOM file size is {_settings.max_dicom_file_mb} MB.",
+            )
+
+        for index, info in enumerate(members):
+            with zip_ref.open(info) as member:
+                header = member.read(DICOM_PREAMBLE_SIZE)
+                if not looks_like_dicom(header):
+                    logger.debug("Skipping non-DICOM ZIP member %s", info.filename)
+                    continue
+                if len(dicom_paths) >= max_files:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Too many DICOM files in {upload.filename}. Only {max_files} more "
+                               f"could be accepted (maximum is {_MAX_SERIES_FILES} per upload).",
+                    )
+
+                # Generated names keep archive paths (and "../" tricks) off the filesystem
+                dicom_path = dest / f"{index:05d}.dcm"
+                with dicom_path.open('wb') as out:
+                    out.write(header)
+                    shutil.copyfileobj(member, out)
+            dicom_paths.append(dicom_path)
+
+    return dicom_paths
+
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check() -> HealthResponse:
@@ -38,30 +240,32 @@ async def health_check() -> HealthResponse:
 
 
 @router.post("/api/debug/dicom")
-async def debug_dicom(files: List[UploadFile] = File(...)):
+async def debug_dicom(
+    files: Annotated[List[UploadFile], File()],
+    decode: Annotated[bool, Query(description="Also decode pixel data")] = True,
+):
     """
     Debug endpoint to test DICOM file decoding without running full pipeline.
     
     Tests up to 5 files and returns metadata about their structure.
     Useful for verifying pixel decoding libraries are installed correctly.
+    With ``decode=false`` only the headers are parsed, for quick triage.
     
     Args:
         files: Uploaded DICOM files (up to 5 will be tested)
+        decode: Whether to read and decode pixel data
         
     Returns:
         Dictionary with decoding results and metadata
     """
-    from io import BytesIO
-    import pydicom
     
     results = []
     tested_files = files[:5]  # Test up to 5 files
     
     for f in tested_files:
         try:
-            b = await f.read()
-            
-            if not b:
+            # Parse straight from the spooled upload rather than a bytes copy
+            if not await f.read(1):
                 results.append({
                     "name": f.filename,
                     "error": "Empty file",
@@ -71,7 +275,11 @@ async def debug_dicom(files: List[UploadFile] = File(...)):
             
             # Try to read DICOM
             try:
-                ds = pydicom.dcmread(BytesIO(b), force=True)
+                await f.seek(0)
+                if decode:
+                    ds = pydicom.dcmread(f.file, force=True)
+                else:
+                    ds = pydicom.dcmread(f.file, force=True, defer_size=METADATA_DEFER_SIZE)
             except Exception as read_error:
                 results.append({
                     "name": f.filename,
@@ -85,14 +293,16 @@ async def debug_dicom(files: List[UploadFile] = File(...)):
             if hasattr(ds, "file_meta") and ds.file_meta:
                 transfer_syntax = str(getattr(ds.file_meta, "TransferSyntaxUID", ""))
             
-            has_pixel = hasattr(ds, "PixelData")
+            has_pixel = "PixelData" in ds
             rows = int(getattr(ds, "Rows", 0))
             cols = int(getattr(ds, "Columns", 0))
             sop_uid = str(getattr(ds, "SOPInstanceUID", ""))
             
             # Try pixel array extraction (this is the key test)
             pixel_test = {"ok": False, "error": None}
-            if has_pixel:
+            if not decode:
+                pixel_test = {"ok": None, "error": None, "skipped": True}
+            elif has_pixel:
                 try:
                     arr = ds.pixel_array
                     pixel_test = {
@@ -114,8 +324,8 @@ async def debug_dicom(files: List[UploadFile] = File(...)):
                 "pixel_test": pixel_test,
                 "rows": rows,
                 "cols": cols,
-                "sop_uid": sop_uid[:30] + "..." if len(sop_uid) > 30 else sop_uid,
-                "file_size": len(b),
+                "sop_uid": _truncate(sop_uid),
+                "file_size": f.size,
             })
             
         except Exception as e:
@@ -132,10 +342,12 @@ async def debug_dicom(files: List[UploadFile] = File(...)):
     }
 
 
-@router.get("/kheops/studies", response_model=StudiesResponse)
+@_internal_errors("Failed to fetch studies")
 async def get_studies(
     album_token: str,
-    kheops_service: Any = Depends(get_kheops_service),  # type: ignore
+    kheops_service: KheopsServiceDep,
+    limit: Annotated[Optional[int], Query(ge=1, description="Maximum number of studies to return")] = None,
+    offset: Annotated[int, Query(ge=0, description="Number of studies to skip")] = 0,
 ) -> StudiesResponse:
     """
     Get all studies from a Kheops album.
@@ -143,47 +355,34 @@ async def get_studies(
     NOTE: Kheops integration is disabled for PoC. This endpoint is kept for future use.
     For PoC, use /api/inference/from-dicom with local file upload.
     """
-    settings = get_settings()
-    if not settings.enable_kheops:
-        raise HTTPException(
-            status_code=503,
-            detail="Kheops integration is disabled for PoC. Please use /api/inference/from-dicom with local file upload."
-        )
     """
     Get all studies from a Kheops album.
 
     Args:
         album_token: Album token for authentication
         kheops_service: Kheops service (injected)
+        limit: Maximum number of studies to return (all if None)
+        offset: Number of studies to skip
 
     Returns:
-        List of studies
+        List of studies (streamed for large albums)
 
     Raises:
         HTTPException: If API request fails
     """
-    try:
-        studies = kheops_service.fetch_studies(album_token)
-        study_responses = [
-            StudyResponse(
-                study_id=study.study_id,
-                study_date=study.study_date,
-                study_description=study.study_description,
-                patient_id=study.patient_id,
-                patient_name=study.patient_name,
-            )
-            for study in studies
-        ]
-        return StudiesResponse(studies=study_responses)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch studies: {str(e)}")
+    # QIDO-RS listings carry metadata only, and Study already matches
+    # StudyResponse field for field, so skip per-item model validation
+    studies = kheops_service.fetch_studies(album_token, limit=limit, offset=offset)
+    if len(studies) > _STREAM_LISTING_THRESHOLD:
+        return StreamingResponse(_iter_json_list("studies", studies), media_type="application/json")
+    return ORJSONResponse({"studies": studies})
 
 
-@router.get("/kheops/studies/{study_id}/series", response_model=SeriesListResponse)
+@_internal_errors("Failed to fetch series")
 async def get_series(
     study_id: str,
     album_token: str,
-    kheops_service: Any = Depends(get_kheops_service),  # type: ignore
+    kheops_service: KheopsServiceDep,
 ) -> SeriesListResponse:
     """
     Get all series within a study.
@@ -202,33 +401,14 @@ async def get_series(
     Raises:
         HTTPException: If API request fails
     """
-    settings = get_settings()
-    if not settings.enable_kheops:
-        raise HTTPException(
-            status_code=503,
-            detail="Kheops integration is disabled for PoC. Please use /api/inference/from-dicom with local file upload."
-        )
-    try:
-        series_list = kheops_service.fetch_series(album_token, study_id)
-        series_responses = [
-            SeriesResponse(
-                series_id=series.series_id,
-                study_id=series.study_id,
-                series_description=series.series_description,
-                modality=series.modality,
-                instance_count=series.instance_count,
-            )
-            for series in series_list
-        ]
-        return SeriesListResponse(series=series_responses)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch series: {str(e)}")
+    series_list = kheops_service.fetch_series(album_token, study_id)
+    return ORJSONResponse({"series": series_list})
 
 
-@router.post("/inference/from-kheops", response_model=ReportResponse)
+@_internal_errors("Failed to generate report")
 async def generate_report_from_kheops(
     request: InferenceFromKheopsRequest,
-    report_generator: Any = Depends(get_report_generator),  # type: ignore
+    report_generator: ReportGeneratorDep,
 ) -> ReportResponse:
     """
     Generate report from Kheops study.
@@ -246,57 +426,62 @@ async def generate_report_from_kheops(
     Raises:
         HTTPException: If report generation fails
     """
-    settings = get_settings()
-    if not settings.enable_kheops:
-        raise HTTPException(
-            status_code=503,
-            detail="Kheops integration is disabled for PoC. Please use /api/inference/from-dicom with local file upload."
-        )
-    try:
-        logger.info(f"Generating report for study {request.study_id}, series {request.series_id}")
-        result = report_generator.generate_report_from_album(
+    logger.info("Generating report for study %s, series %s", request.study_id, request.series_id)
+    # Inference is CPU-bound; run it off the event loop
+    async with _inference_slots:
+        result = await run_in_threadpool(
+            report_generator.generate_report_from_album,
             request.album_token,
             request.study_id,
             request.series_id,
         )
 
-        from backend.app.models.schemas import ClinicalReportResponse, DiagnosisResponse
-
-        return ReportResponse(
-            report=ClinicalReportResponse(
-                clinical_history=result["report"].clinical_history,
-                findings=result["report"].findings,
-                impression=result["report"].impression,
-                recommendations=result["report"].recommendations,
-                generated_at=result["report"].generated_at,
-            ),
-            diagnosis=DiagnosisResponse(
-                abnormalities=result["diagnosis"].abnormalities,
-                confidence_scores=result["diagnosis"].confidence_scores,
-                findings=result["diagnosis"].findings,
-                timestamp=result["diagnosis"].timestamp,
-            ),
-            dicom_metadata=result["dicom_metadata"],
-        )
-    except Exception as e:
-        logger.exception(f"Error generating report: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Failed to generate report: {str(e)}")
+    return ORJSONResponse(_report_payload(result))
+
+
+async def _kheops_disabled() -> Response:
+    """Answer any Kheops route with 503 without resolving its dependencies."""
+    return Response(content=_KHEOPS_DISABLED_BODY, status_code=503, media_type="application/json")
+
+
+# Kheops routes are only wired up when enabled; otherwise each path is bound
+# to a dependency-free stub so disabled requests never build services.
+if _KHEOPS_ENABLED:
+    router.add_api_route("/kheops/studies", get_studies, methods=["GET"], response_model=StudiesResponse)
+    router.add_api_route(
+        "/kheops/studies/{study_id}/series", get_series, methods=["GET"], response_model=SeriesListResponse
+    )
+    router.add_api_route(
+        "/inference/from-kheops", generate_report_from_kheops, methods=["POST"], response_model=ReportResponse
+    )
+else:
+    for _path, _methods in (
+        ("/kheops/studies", ["GET"]),
+        ("/kheops/studies/{study_id}/series", ["GET"]),
+        ("/inference/from-kheops", ["POST"]),
+    ):
+        router.add_api_route(_path, _kheops_disabled, methods=_methods, include_in_schema=False)
 
 
 @router.post("/inference/from-dicom", response_model=ReportResponse)
+@_internal_errors("Failed to generate report")
 async def generate_report_from_dicom(
-    dicom_files: List[UploadFile] = File(...),
-    report_generator: Any = Depends(get_report_generator),  # type: ignore
+    dicom_files: Annotated[List[UploadFile], File()],
+    report_generator: ReportGeneratorDep,
+    if_none_match: Annotated[Optional[str], Header()] = None,
 ) -> ReportResponse:
     """
     Generate report from uploaded DICOM file(s).
     
     Supports both single file and multiple files (series).
     When multiple files are uploaded, generates an aggregated report.
+    While the report cache is enabled, responses carry an ETag derived from
+    the upload content, and a matching If-None-Match is answered with 304.
 
     Args:
         dicom_files: Uploaded DICOM file(s) - can be single file or multiple files
         report_generator: Report generator (injected)
+        if_none_match: If-None-Match request header, for revalidation
 
     Returns:
         Generated report with diagnosis
@@ -304,200 +489,113 @@ async def generate_report_from_dicom(
     Raises:
         HTTPException: If report generation fails
     """
-    # #region agent log
-    import json
-    import time
-    with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-        f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"ALL","location":"routes.py:191","message":"API route entry","data":{"file_count":len(dicom_files) if dicom_files else 0},"timestamp":int(time.time()*1000)})+'\n')
-    # #endregion
+    zip_tmpdirs = []
     try:
         if not dicom_files:
             raise HTTPException(status_code=400, detail="No DICOM files provided")
         
-        logger.info(f"Processing {len(dicom_files)} DICOM file(s)")
+        logger.info("Processing %d DICOM file(s)", len(dicom_files))
+
+        # Reject oversized uploads before touching their contents
+        if len(dicom_files) > _MAX_SERIES_FILES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Too many files. Maximum is {_MAX_SERIES_FILES} per upload.",
+            )
+        for dicom_file in dicom_files:
+            if not _is_zip_upload(dicom_file) and (dicom_file.size or 0) > _MAX_DICOM_FILE_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File {dicom_file.filename} too large. "
+                           f"Maximum DICOM file size is {_settings.max_dicom_file_mb} MB.",
+                )
         
-        # Read all uploaded files
+        # Collect uploaded files without buffering them in memory.
+        # Starlette already spools each upload to a SpooledTemporaryFile, so
+        # regular uploads are handed to the report generator as file objects
+        # and only read by the worker that parses them.
         # Handle both individual files and ZIP archives
-        dicom_bytes_list = []
+        dicom_sources = []
+
+        # Peek at all regular uploads concurrently instead of one at a time
+        regular_indices = [idx for idx, f in enumerate(dicom_files) if not _is_zip_upload(f)]
+        peeked = await asyncio.gather(*(_peek_header(dicom_files[idx]) for idx in regular_indices))
+        headers = dict(zip(regular_indices, peeked))
         
         for idx, dicom_file in enumerate(dicom_files):
-            # #region agent log
-            with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"ALL","location":"routes.py:221","message":"Reading file","data":{"file_index":idx,"filename":dicom_file.filename},"timestamp":int(time.time()*1000)})+'\n')
-            # #endregion
-            
-            dicom_bytes = await dicom_file.read()
-            
+            logger.debug("Reading upload %d: %s", idx, dicom_file.filename)
+
             # Check if it's a ZIP file (KHEOPS exports are often ZIP)
-            if dicom_file.filename and dicom_file.filename.lower().endswith('.zip'):
-                import zipfile
-                import tempfile
-                from pathlib import Path
-                from backend.app.utils.dicom_utils import collect_all_files_recursively, looks_like_dicom
-                
-                logger.info(f"Detected ZIP file: {dicom_file.filename}, extracting...")
-                
-                # Extract ZIP to temporary directory
-                with tempfile.TemporaryDirectory() as tmpdir:
-                    tmp_path = Path(tmpdir)
-                    zip_path = tmp_path / dicom_file.filename
-                    zip_path.write_bytes(dicom_bytes)
-                    
-                    # Extract ZIP
-                    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                        zip_ref.extractall(tmp_path)
-                    
-                    # Recursively collect all files (handles DICOM/0/* structure)
-                    all_files = collect_all_files_recursively(tmp_path)
-                    logger.info(f"Found {len(all_files)} files in ZIP archive")
-                    
-                    # Read and filter DICOM files
-                    for file_path in all_files:
-                        try:
-                            file_bytes = file_path.read_bytes()
-                            if looks_like_dicom(file_bytes):
-                                dicom_bytes_list.append(file_bytes)
-                                logger.debug(f"Added DICOM file from ZIP: {file_path.name}")
-                        except Exception as e:
-                            logger.warning(f"Failed to read file {file_path.name} from ZIP: {str(e)}")
-                            continue
-                
-                logger.info(f"Extracted {len(dicom_bytes_list)} DICOM files from ZIP")
+            if _is_zip_upload(dicom_file):
+                logger.info("Detected ZIP file: %s, extracting...", dicom_file.filename)
+
+                # Extract ZIP to a temporary directory that lives until the
+                # report is built, so members are only read by the worker
+                # that parses them
+                tmpdir = tempfile.TemporaryDirectory()
+                zip_tmpdirs.append(tmpdir)
+                tmp_path = Path(tmpdir.name)
+
+                # Extraction and header checks are blocking disk work, so they
+                # run on the threadpool instead of the event loop
+                await dicom_file.seek(0)
+                zip_dicom_paths = await run_in_threadpool(
+                    _extract_zip_upload, dicom_file, tmp_path, _MAX_SERIES_FILES - len(dicom_sources)
+                )
+                dicom_sources.extend(zip_dicom_paths)
+                logger.info("Extracted %d DICOM files from ZIP", len(zip_dicom_paths))
             else:
-                # Regular file upload
-                # #region agent log
-                with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                    f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"ALL","location":"routes.py:223","message":"File read complete","data":{"file_index":idx,"bytes_length":len(dicom_bytes)},"timestamp":int(time.time()*1000)})+'\n')
-                # #endregion
-                
+                # Regular file upload: only the preamble has been read
+                header = headers[idx]
+
                 # Validate it looks like DICOM
-                from backend.app.utils.dicom_utils import looks_like_dicom
-                if looks_like_dicom(dicom_bytes):
-                    dicom_bytes_list.append(dicom_bytes)
+                if looks_like_dicom(header):
+                    dicom_sources.append(dicom_file.file)
                 else:
-                    logger.warning(f"File {dicom_file.filename} doesn't appear to be DICOM format, skipping")
+                    logger.warning("File %s doesn't appear to be DICOM format, skipping", dicom_file.filename)
 
-        # Process single file or series
-        try:
-            if len(dicom_bytes_list) == 1:
-                # #region agent log
-                with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                    f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"ALL","location":"routes.py:225","message":"Processing single file","data":{},"timestamp":int(time.time()*1000)})+'\n')
-                # #endregion
-                logger.info("Processing single DICOM file")
-                result = report_generator.generate_report_from_dicom(dicom_bytes_list[0])
-            else:
-                # #region agent log
-                with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                    f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"ALL","location":"routes.py:228","message":"Processing series","data":{"file_count":len(dicom_bytes_list)},"timestamp":int(time.time()*1000)})+'\n')
-                # #endregion
-                logger.info(f"Processing DICOM series with {len(dicom_bytes_list)} images")
-                result = report_generator.generate_report_from_dicom_series(dicom_bytes_list)
-        except Exception as e:
-            import traceback
-            tb = traceback.format_exc()
-            error_type = type(e).__name__
-            error_msg = str(e)
-            
-            logger.error(f"Inference failed: {error_type}: {error_msg}")
-            logger.error(f"Full traceback:\n{tb}")
-            
-            # Return detailed error information
+        # Nothing passed the DICM check: fail fast instead of entering the pipeline
+        if not dicom_sources:
             raise HTTPException(
-                status_code=500,
-                detail={
-                    "error": error_msg,
-                    "type": error_type,
-                    "traceback_tail": tb.splitlines()[-40:],  # Last 40 lines of traceback
-                },
+                status_code=415,
+                detail="No valid DICOM files found in upload (missing DICM signature).",
             )
 
-        # #region agent log
-        with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-            f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"E","location":"routes.py:232","message":"Building response schema","data":{"has_report":'report' in result,"has_diagnosis":'diagnosis' in result,"has_metadata":'dicom_metadata' in result},"timestamp":int(time.time()*1000)})+'\n')
-        # #endregion
-
-        from backend.app.models.schemas import ClinicalReportResponse, DiagnosisResponse
-
-        # #region agent log
-        try:
-            report_obj = result["report"]
-            diagnosis_obj = result["diagnosis"]
-            with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"E","location":"routes.py:262","message":"Before schema creation","data":{"report_type":type(report_obj).__name__,"diagnosis_type":type(diagnosis_obj).__name__,"has_clinical_history":hasattr(report_obj,'clinical_history'),"has_findings":hasattr(report_obj,'findings')},"timestamp":int(time.time()*1000)})+'\n')
-        except Exception as schema_err:
-            with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"E","location":"routes.py:265","message":"Schema access error","data":{"error":str(schema_err)},"timestamp":int(time.time()*1000)})+'\n')
-            raise
-        # #endregion
+        # Identical uploads get the previously generated report. Hashing reads
+        # every uploaded byte, so it is skipped when the cache is disabled;
+        # the per-file digests are handed on to the preprocessing cache.
+        digests = None
+        cache_key = None
+        etag_headers = None
+        if _report_cache.maxsize > 0:
+            digests = await run_in_threadpool(content_digests, dicom_sources)
+            cache_key = combine_content_digests(digests)
+            etag = f'"{cache_key}"'
+            etag_headers = {"ETag": etag}
+            if _etag_matches(if_none_match, etag):
+                logger.info("Upload %.16s unchanged for client, returning 304", cache_key)
+                return Response(status_code=304, headers=etag_headers)
+            cached_body = _report_cache.get(cache_key)
+            if cached_body is not None:
+                logger.info("Returning cached report for upload %.16s", cache_key)
+                return Response(content=cached_body, media_type="application/json", headers=etag_headers)
 
-        try:
-            # #region agent log
-            with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"E","location":"routes.py:273","message":"Creating ClinicalReportResponse","data":{},"timestamp":int(time.time()*1000)})+'\n')
-            # #endregion
-            clinical_report_response = ClinicalReportResponse(
-                clinical_history=result["report"].clinical_history,
-                findings=result["report"].findings,
-                impression=result["report"].impression,
-                recommendations=result["report"].recommendations,
-                generated_at=result["report"].generated_at,
-            )
-            # #region agent log
-            with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"E","location":"routes.py:281","message":"Creating DiagnosisResponse","data":{},"timestamp":int(time.time()*1000)})+'\n')
-            # #endregion
-            diagnosis_response = DiagnosisResponse(
-                abnormalities=result["diagnosis"].abnormalities,
-                confidence_scores=result["diagnosis"].confidence_scores,
-                findings=result["diagnosis"].findings,
-                timestamp=result["diagnosis"].timestamp,
-            )
-            # #region agent log
-            with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"E","location":"routes.py:288","message":"Creating ReportResponse","data":{},"timestamp":int(time.time()*1000)})+'\n')
-            # #endregion
-            response = ReportResponse(
-                report=clinical_report_response,
-                diagnosis=diagnosis_response,
-                dicom_metadata=result["dicom_metadata"],
-            )
-            # #region agent log
-            with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"E","location":"routes.py:295","message":"ReportResponse created successfully","data":{},"timestamp":int(time.time()*1000)})+'\n')
-            # #endregion
-        except Exception as schema_err:
-            # #region agent log
-            with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"E","location":"routes.py:298","message":"Schema creation exception","data":{"error_type":type(schema_err).__name__,"error_msg":str(schema_err)},"timestamp":int(time.time()*1000)})+'\n')
-            # #endregion
-            raise
-        # #region agent log
-        with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-            f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"ALL","location":"routes.py:252","message":"API route exit success","data":{},"timestamp":int(time.time()*1000)})+'\n')
-        # #endregion
+        # Process single file or series
+        if len(dicom_sources) == 1:
+            logger.info("Processing single DICOM file")
+            async with _inference_slots:
+                result = await run_in_threadpool(report_generator.generate_report_from_dicom, dicom_sources[0])
+        else:
+            logger.info("Processing DICOM series with %d images", len(dicom_sources))
+            async with _inference_slots:
+                result = await run_in_threadpool(
+                    report_generator.generate_report_from_dicom_series, dicom_sources, digests=digests
+                )
+
+        response = ORJSONResponse(_report_payload(result), headers=etag_headers)
+        if cache_key is not None:
+            _report_cache.set(cache_key, response.body)
         return response
-    except HTTPException:
-        # Re-raise HTTPException as-is (already has detailed error info)
-        raise
-    except Exception as e:
-        import traceback
-        tb = traceback.format_exc()
-        error_type = type(e).__name__
-        error_msg = str(e)
-        
-        # #region agent log
-        with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-            f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"ALL","location":"routes.py:255","message":"API route exception","data":{"error_type":error_type,"error_msg":error_msg},"timestamp":int(time.time()*1000)})+'\n')
-        # #endregion
-        
-        logger.exception(f"Error generating report: {error_type}: {error_msg}", exc_info=True)
-        
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": error_msg,
-                "type": error_type,
-                "traceback_tail": tb.splitlines()[-40:],
-            },
-        )
+    finally:
+        for tmpdir in zip_tmpdirs:
+            tmpdir.cleanup()
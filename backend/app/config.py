@@ -1,5 +1,6 @@
 """Configuration management using pydantic-settings."""
 
+from functools import lru_cache
 from typing import List
 
 from pydantic import Field
@@ -29,6 +30,18 @@ class Settings(BaseSettings):
         default="",
         description="Album token for Kheops authentication",
     )
+    kheops_download_concurrency: int = Field(
+        default=8,
+        description="Maximum number of DICOM instances downloaded from Kheops at once",
+    )
+    kheops_metadata_cache_size: int = Field(
+        default=256,
+        description="Number of Kheops study/series/instance listings cached per album token (0 disables)",
+    )
+    kheops_metadata_ttl_seconds: int = Field(
+        default=60,
+        description="Lifetime in seconds of a cached Kheops metadata listing",
+    )
 
     # MONAI Configuration
     monai_model_path: str = Field(
@@ -67,6 +80,10 @@ class Settings(BaseSettings):
         default=4,
         description="Maximum number of parallel workers for processing",
     )
+    max_concurrent_inferences: int = Field(
+        default=2,
+        description="Maximum number of report generations running at once; further requests wait",
+    )
 
     # FastAPI Configuration
     api_host: str = Field(
@@ -89,6 +106,30 @@ class Settings(BaseSettings):
         default=500,
         description="Maximum file upload size in MB (for ZIP files and DICOM series)",
     )
+    max_dicom_file_mb: int = Field(
+        default=100,
+        description="Maximum size in MB of a single uploaded DICOM file",
+    )
+    max_series_files: int = Field(
+        default=2000,
+        description="Maximum number of files accepted in one upload (including ZIP members)",
+    )
+
+    # Report Cache Configuration
+    report_cache_size: int = Field(
+        default=32,
+        description="Number of generated reports cached by upload content hash (0 disables)",
+    )
+    report_cache_ttl_seconds: int = Field(
+        default=600,
+        description="Lifetime in seconds of a cached report",
+    )
+
+    # Preprocessing Cache Configuration
+    preprocess_cache_size: int = Field(
+        default=256,
+        description="Number of preprocessed slices cached by file content hash (0 disables)",
+    )
 
     # Logging Configuration
     log_level: str = Field(
@@ -97,6 +138,12 @@ class Settings(BaseSettings):
     )
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Get application settings instance."""
+    """
+    Get the application settings instance.
+
+    Settings are read from the environment and .env once per process;
+    call ``get_settings.cache_clear()`` to pick up changes.
+    """
     return Settings()
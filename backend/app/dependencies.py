@@ -2,6 +2,10 @@
 
 import os
 import logging
+from functools import lru_cache
+from typing import Annotated
+
+from fastapi import Depends
 
 from backend.app.config import get_settings
 from backend.app.services.dicom_parser import DicomParserService
@@ -14,6 +18,7 @@ from backend.app.utils.exceptions import ModelLoadError
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
 def get_kheops_service() -> KheopsService:
     """
     Get Kheops service instance.
@@ -24,6 +29,7 @@ def get_kheops_service() -> KheopsService:
     return KheopsService()
 
 
+@lru_cache(maxsize=1)
 def get_dicom_parser() -> DicomParserService:
     """
     Get DICOM parser service instance.
@@ -34,6 +40,7 @@ def get_dicom_parser() -> DicomParserService:
     return DicomParserService()
 
 
+@lru_cache(maxsize=1)
 def get_monai_service() -> MonaiService:
     """
     Get MONAI service instance and load model if available.
@@ -63,6 +70,7 @@ def get_monai_service() -> MonaiService:
     return service
 
 
+@lru_cache(maxsize=1)
 def get_llm_service() -> LLMService:
     """
     Get LLM service instance.
@@ -73,10 +81,14 @@ def get_llm_service() -> LLMService:
     return LLMService()
 
 
+@lru_cache(maxsize=1)
 def get_report_generator() -> ReportGenerator:
     """
     Get report generator instance with dependencies.
 
+    Like the other providers, the instance is built once per process so the
+    MONAI model is only loaded on first use.
+
     Returns:
         ReportGenerator instance
     """
@@ -86,3 +98,8 @@ def get_report_generator() -> ReportGenerator:
         diagnosis_provider=get_monai_service(),
         report_generator=get_llm_service(),
     )
+
+
+# Typed dependency aliases for route signatures
+KheopsServiceDep = Annotated[KheopsService, Depends(get_kheops_service)]
+ReportGeneratorDep = Annotated[ReportGenerator, Depends(get_report_generator)]
@@ -3,12 +3,15 @@
 import sys
 import logging
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from backend.app.api.routes import router
 from backend.app.config import get_settings
+from backend.app.dependencies import get_kheops_service, get_report_generator
 
 # Check Python version on startup
 logger = logging.getLogger(__name__)
@@ -38,33 +41,59 @@ app = FastAPI(
     title="Brain CT Report Generator API",
     description="API for generating clinical reports from Brain CT images using MONAI and LLM",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
 )
 
 # Configure maximum upload size (500 MB default)
 MAX_UPLOAD_SIZE = settings.max_upload_size_mb * 1024 * 1024  # Convert MB to bytes
 
-class UploadSizeMiddleware(BaseHTTPMiddleware):
-    """Middleware to enforce maximum upload size."""
-    async def dispatch(self, request: Request, call_next):
-        content_length = request.headers.get("content-length")
-        if content_length:
-            size = int(content_length)
-            if size > MAX_UPLOAD_SIZE:
-                from fastapi import HTTPException
-                raise HTTPException(
-                    status_code=413,
-                    detail=f"File too large. Maximum upload size is {settings.max_upload_size_mb} MB. "
-                           f"Received {size / 1024 / 1024:.2f} MB."
-                )
-        return await call_next(request)
-
-app.add_middleware(UploadSizeMiddleware)
+class UploadSizeMiddleware:
+    """
+    ASGI middleware to enforce maximum upload size.
+
+    Implemented as plain ASGI rather than BaseHTTPMiddleware, so requests
+    aren't wrapped in an extra task and memory stream.
+    """
+
+    def __init__(self, app: ASGIApp, max_size: int):
+        """
+        Initialize middleware.
+
+        Args:
+            app: Wrapped ASGI application
+            max_size: Maximum request body size in bytes
+        """
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Reject requests whose declared Content-Length exceeds max_size with a 413."""
+        if scope["type"] == "http":
+            content_length = next(
+                (value for name, value in scope["headers"] if name == b"content-length"), None
+            )
+            if content_length is not None and content_length.isdigit():
+                size = int(content_length)
+                if size > self.max_size:
+                    response = JSONResponse(
+                        status_code=413,
+                        content={
+                            "detail": f"File too large. Maximum upload size is {settings.max_upload_size_mb} MB. "
+                                      f"Received {size / 1024 / 1024:.2f} MB."
+                        },
+                    )
+                    await response(scope, receive, send)
+                    return
+        await self.app(scope, receive, send)
+
+app.add_middleware(UploadSizeMiddleware, max_size=MAX_UPLOAD_SIZE)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    # Explicit lists let the middleware build its preflight headers once
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type"],
 )
 
 app.include_router(router)
@@ -73,10 +102,15 @@ app.include_router(router)
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup."""
-    pass
+    # Build the cached service singletons (and load the MONAI model) now,
+    # so the first inference request doesn't pay for it
+    await run_in_threadpool(get_report_generator)
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown."""
-    pass
+    # Release pooled Kheops connections; only if the singleton was built,
+    # so shutdown doesn't construct a service just to close it
+    if get_kheops_service.cache_info().currsize:
+        get_kheops_service().close()
@@ -5,7 +5,7 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Study:
     """Represents a DICOM study."""
 
@@ -16,7 +16,7 @@ class Study:
     patient_name: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Series:
     """Represents a DICOM series."""
 
@@ -27,7 +27,7 @@ class Series:
     instance_count: Optional[int] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class DicomData:
     """Represents parsed DICOM data."""
 
@@ -45,7 +45,7 @@ class DicomData:
             self.metadata = {}
 
 
-@dataclass
+@dataclass(slots=True)
 class DiagnosisResult:
     """Represents diagnosis results from MONAI model."""
 
@@ -60,7 +60,7 @@ class DiagnosisResult:
             self.timestamp = datetime.now()
 
 
-@dataclass
+@dataclass(slots=True)
 class ClinicalReport:
     """Represents a formatted clinical report."""
 
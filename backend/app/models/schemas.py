@@ -3,12 +3,14 @@
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class StudyResponse(BaseModel):
     """Response schema for a study."""
 
+    model_config = ConfigDict(from_attributes=True)
+
     study_id: str = Field(..., description="Study instance UID")
     study_date: Optional[str] = Field(None, description="Study date")
     study_description: Optional[str] = Field(None, description="Study description")
@@ -19,6 +21,8 @@ class StudyResponse(BaseModel):
 class SeriesResponse(BaseModel):
     """Response schema for a series."""
 
+    model_config = ConfigDict(from_attributes=True)
+
     series_id: str = Field(..., description="Series instance UID")
     study_id: str = Field(..., description="Study instance UID")
     series_description: Optional[str] = Field(None, description="Series description")
@@ -48,6 +52,8 @@ class AbnormalityItem(BaseModel):
 class DiagnosisResponse(BaseModel):
     """Response schema for diagnosis results."""
 
+    model_config = ConfigDict(from_attributes=True)
+
     abnormalities: List[str] = Field(..., description="List of detected abnormalities")
     confidence_scores: Dict[str, float] = Field(..., description="Confidence scores by class")
     findings: Dict[str, Any] = Field(..., description="Detailed findings")
@@ -57,6 +63,8 @@ class DiagnosisResponse(BaseModel):
 class ClinicalReportResponse(BaseModel):
     """Response schema for clinical report."""
 
+    model_config = ConfigDict(from_attributes=True)
+
     clinical_history: Optional[str] = Field(None, description="Clinical history")
     findings: Optional[str] = Field(None, description="Findings")
     impression: Optional[str] = Field(None, description="Impression")
@@ -1,29 +1,260 @@
 """DICOM file parsing service."""
 
 import logging
-import traceback
+import re
 from io import BytesIO
-from typing import Dict, Any
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Tuple, Union
 
 import numpy as np
 import pydicom
+from pydicom.dataelem import RawDataElement
+from pydicom.pixel_data_handlers import gdcm_handler, pillow_handler, pylibjpeg_handler
+from pydicom.uid import ExplicitVRLittleEndian, ImplicitVRLittleEndian
 
 from backend.app.models.domain import DicomData
 from backend.app.services.interfaces import IDicomParser
+from backend.app.utils.dicom_utils import (
+    METADATA_DEFER_SIZE,
+    DicomSource,
+    dicom_source_size,
+    looks_like_dicom,
+)
 from backend.app.utils.exceptions import DicomParseError
 
 logger = logging.getLogger(__name__)
 
+# DicomData identifier fields and the tags they are read from. Lookups use
+# tag numbers so pydicom skips the keyword-to-tag translation per access.
+_IDENTIFIER_TAGS = {
+    "study_id": 0x0020000D,  # StudyInstanceUID
+    "series_id": 0x0020000E,  # SeriesInstanceUID
+    "instance_id": 0x00080018,  # SOPInstanceUID
+    "patient_id": 0x00100020,  # PatientID
+    "patient_name": 0x00100010,  # PatientName
+    "study_date": 0x00080020,  # StudyDate
+}
+
+# Image metadata fields and their tags
+_METADATA_TAGS = {
+    "modality": 0x00080060,  # Modality
+    "slice_thickness": 0x00180050,  # SliceThickness
+    "pixel_spacing": 0x00280030,  # PixelSpacing
+    "rows": 0x00280010,  # Rows
+    "columns": 0x00280011,  # Columns
+}
+
+_PIXEL_DATA_TAG = 0x7FE00010  # PixelData
+
+# Value representations that are always plain ASCII (UIDs, dates, code
+# strings), so their raw bytes can be decoded without charset handling
+_ASCII_VRS = frozenset({"UI", "DA", "CS"})
+
+# Leading bytes inspected when checking for text (JSON/HTML/XML) payloads
+_TEXT_SNIFF_SIZE = 64
+
+# Preamble plus DICM signature, enough to run the pre-parse checks
+_HEADER_PROBE_SIZE = 132
+
+# Pixel decoding errors that point at missing compressed-data decoders
+_COMPRESSION_ERROR_RE = re.compile(r"compressed|decompress|jpeg", re.IGNORECASE)
+
+# Uncompressed transfer syntaxes whose PixelData can be viewed directly
+_NATIVE_LE_SYNTAXES = frozenset({ExplicitVRLittleEndian, ImplicitVRLittleEndian})
+
+# Decoders tried for compressed pixel data, fastest first. pydicom's default
+# chain tries GDCM and Pillow before pylibjpeg; availability is probed once here.
+_COMPRESSED_PIXEL_HANDLERS = tuple(
+    name
+    for name, handler in (
+        ("pylibjpeg", pylibjpeg_handler),
+        ("gdcm", gdcm_handler),
+        ("pillow", pillow_handler),
+    )
+    if handler.is_available()
+)
+
+
+def _get_tag_value(dicom_file: pydicom.Dataset, tag: int) -> str | None:
+    """
+    Get DICOM tag value safely.
+
+    Args:
+        dicom_file: Pydicom dataset
+        tag: DICOM tag number, e.g. 0x0020000D
+
+    Returns:
+        Tag value as string or None if not found
+    """
+    try:
+        element = dicom_file.get_item(tag)
+        if element is None:
+            return None
+
+        # Fast path: decode ASCII-only elements pydicom hasn't converted yet
+        # straight from their raw bytes, taking the first of any multi-values
+        if isinstance(element, RawDataElement) and element.VR in _ASCII_VRS and element.value is not None:
+            return element.value.split(b"\\", 1)[0].decode("ascii").strip(" \x00")
+
+        tag_value = dicom_file[tag].value
+        if tag_value is None:
+            return None
+
+        if isinstance(tag_value, pydicom.multival.MultiValue):
+            return str(tag_value[0]) if len(tag_value) > 0 else None
+
+        return str(tag_value)
+    except Exception:
+        return None
+
+
+def _extract_metadata(dicom_file: pydicom.Dataset) -> Dict[str, Any]:
+    """
+    Extract metadata from DICOM file.
+
+    Args:
+        dicom_file: Pydicom dataset
+
+    Returns:
+        Dictionary with metadata
+    """
+    metadata = {}
+    for field, tag in _METADATA_TAGS.items():
+        element = dicom_file.get(tag)
+        metadata[field] = element.value if element is not None else None
+
+    return metadata
+
+
+def _open_dicom_source(dicom_source: DicomSource) -> Tuple[bytes, int, Union[BinaryIO, str]]:
+    """
+    Prepare a DICOM source for dcmread without loading file-backed sources.
+
+    Args:
+        dicom_source: Raw DICOM bytes, a seekable binary file object or a file path
+
+    Returns:
+        Tuple of (leading bytes, total size, object to pass to dcmread). Paths
+        are passed as strings, so deferred elements are re-read from disk.
+    """
+    if isinstance(dicom_source, bytes):
+        return dicom_source[:_HEADER_PROBE_SIZE], len(dicom_source), BytesIO(dicom_source)
+
+    size = dicom_source_size(dicom_source)
+    if isinstance(dicom_source, Path):
+        with dicom_source.open("rb") as fh:
+            return fh.read(_HEADER_PROBE_SIZE), size, str(dicom_source)
+
+    head = dicom_source.read(_HEADER_PROBE_SIZE)
+    dicom_source.seek(0)
+    return head, size, dicom_source
+
+
+def _get_transfer_syntax(dicom_file: pydicom.Dataset) -> pydicom.uid.UID | None:
+    """
+    Get the transfer syntax of a dataset.
+
+    Datasets without file meta (raw DICOM streams, datasets built in memory)
+    fall back to the little-endian syntax matching how they were encoded.
+
+    Args:
+        dicom_file: Pydicom dataset
+
+    Returns:
+        Transfer syntax UID or None if unknown
+    """
+    file_meta = getattr(dicom_file, "file_meta", None)
+    transfer_syntax = file_meta.get("TransferSyntaxUID") if file_meta is not None else None
+    if transfer_syntax is None and getattr(dicom_file, "is_little_endian", None):
+        return ImplicitVRLittleEndian if dicom_file.is_implicit_VR else ExplicitVRLittleEndian
+    return transfer_syntax
+
+
+def _read_native_pixels(
+    dicom_file: pydicom.Dataset, transfer_syntax: pydicom.uid.UID | None
+) -> np.ndarray | None:
+    """
+    View uncompressed little-endian monochrome pixel data without a handler.
+
+    Covers the common CT layout (one sample per pixel, 8 or 16 bits allocated)
+    by wrapping PixelData with np.frombuffer; anything else returns None so
+    the regular handler chain decodes it.
+
+    Args:
+        dicom_file: Pydicom dataset
+        transfer_syntax: Transfer syntax of the dataset
+
+    Returns:
+        Read-only view of PixelData shaped (rows, columns) or
+        (frames, rows, columns), or None
+    """
+    if transfer_syntax not in _NATIVE_LE_SYNTAXES:
+        return None
+
+    bits_allocated = dicom_file.get("BitsAllocated")
+    if dicom_file.get("SamplesPerPixel", 1) != 1 or bits_allocated not in (8, 16):
+        return None
+
+    rows = dicom_file.get("Rows")
+    columns = dicom_file.get("Columns")
+    if not rows or not columns:
+        return None
+
+    frames = int(dicom_file.get("NumberOfFrames") or 1)
+    kind = "i" if dicom_file.get("PixelRepresentation", 0) else "u"
+    dtype = np.dtype(f"<{kind}{bits_allocated // 8}")
+    count = frames * rows * columns
+
+    pixel_bytes = dicom_file.PixelData
+    if len(pixel_bytes) < count * dtype.itemsize:
+        return None
+
+    pixels = np.frombuffer(pixel_bytes, dtype=dtype, count=count)
+    return pixels.reshape((frames, rows, columns) if frames > 1 else (rows, columns))
+
+
+def _decode_compressed_pixels(
+    dicom_file: pydicom.Dataset, transfer_syntax: pydicom.uid.UID | None
+) -> str | None:
+    """
+    Decode compressed pixel data with the first preferred handler that succeeds.
+
+    Uncompressed data (or an unknown transfer syntax) is left to the default
+    handler chain when pixel_array is accessed.
+
+    Args:
+        dicom_file: Pydicom dataset
+        transfer_syntax: Transfer syntax of the dataset
+
+    Returns:
+        Name of the handler that decoded the pixels, or None if none was used
+    """
+    if transfer_syntax is None or not transfer_syntax.is_compressed:
+        return None
+
+    for handler_name in _COMPRESSED_PIXEL_HANDLERS:
+        try:
+            dicom_file.convert_pixel_data(handler_name=handler_name)
+            return handler_name
+        except Exception as e:
+            logger.debug("Pixel handler %s failed for %s: %s", handler_name, transfer_syntax, e)
+
+    return None
+
 
 class DicomParserService(IDicomParser):
     """Service for parsing DICOM files."""
 
-    def parse_dicom_file(self, dicom_bytes: bytes) -> DicomData:
+    def parse_dicom_file(self, dicom_source: DicomSource) -> DicomData:
         """
         Parse DICOM file bytes into DicomData object.
 
+        File objects and paths are read directly by pydicom rather than being
+        loaded into memory first; pixel data stays on disk until
+        extract_pixel_array needs it.
+
         Args:
-            dicom_bytes: Raw DICOM file bytes
+            dicom_source: Raw DICOM bytes, a seekable binary file object or a file path
 
         Returns:
             Parsed DicomData object
@@ -32,41 +263,46 @@ class DicomParserService(IDicomParser):
             DicomParseError: If parsing fails
         """
         try:
-            # Check if content is JSON (metadata) instead of binary DICOM
-            if dicom_bytes.startswith(b"{") or dicom_bytes.startswith(b"["):
+            head, size, fp = _open_dicom_source(dicom_source)
+
+            # Check if content is JSON (metadata) or an HTML/XML error page
+            # instead of binary DICOM; the first non-whitespace byte is enough
+            # to tell, so text payloads never reach dcmread
+            leading = head[:_TEXT_SNIFF_SIZE].lstrip()[:1]
+            if leading in (b"{", b"["):
                 raise DicomParseError(
                     "Received JSON metadata instead of binary DICOM file. "
                     "The Kheops API may not support direct file downloads."
                 )
+            if leading == b"<" and not looks_like_dicom(head):
+                raise DicomParseError(
+                    "Received an HTML/XML document instead of binary DICOM file. "
+                    "The server may have returned an error page."
+                )
             
-            # Check for DICOM signature at offset 128 (only for files large enough)
+            # Check for DICOM signature at offset 128
             # Files created by pydicom.dcmwrite may not have this signature, so we're lenient
-            if len(dicom_bytes) >= 132:
-                has_dicm_signature = (
-                    dicom_bytes[128:132] == b"DICM" or 
-                    dicom_bytes[:4] == b"DICM"
+            # and only require it for large files, to avoid parsing JSON/metadata
+            if size > 10000 and not looks_like_dicom(head):
+                raise DicomParseError(
+                    "File does not appear to be a valid DICOM file. "
+                    "Missing DICM signature. "
+                    "The downloaded content may be metadata instead of binary DICOM data."
                 )
-                # If file is large but doesn't have DICM signature, it might be invalid
-                # But we'll still try to parse it in case it's a valid DICOM without header
-                if len(dicom_bytes) > 10000 and not has_dicm_signature:
-                    # For large files, require DICM signature to avoid parsing JSON/metadata
-                    raise DicomParseError(
-                        "File does not appear to be a valid DICOM file. "
-                        "Missing DICM signature. "
-                        "The downloaded content may be metadata instead of binary DICOM data."
-                    )
             
             # Try reading DICOM file
             dicom_file = None
-            parse_error = None
             
+            # Only metadata is needed here; pixel data is decoded later by
+            # extract_pixel_array, so leave it unread rather than copying it
             try:
-                dicom_file = pydicom.dcmread(BytesIO(dicom_bytes))
+                dicom_file = pydicom.dcmread(fp, defer_size=METADATA_DEFER_SIZE)
             except Exception as e:
-                parse_error = e
-                # If standard read fails, try with force=True
+                # If standard read fails, rewind and try with force=True
+                if not isinstance(fp, str):
+                    fp.seek(0)
                 try:
-                    dicom_file = pydicom.dcmread(BytesIO(dicom_bytes), force=True)
+                    dicom_file = pydicom.dcmread(fp, force=True, defer_size=METADATA_DEFER_SIZE)
                 except Exception as force_error:
                     raise DicomParseError(
                         f"Failed to parse DICOM file: {str(e)}. "
@@ -76,26 +312,29 @@ class DicomParserService(IDicomParser):
             # Verify we got a proper Dataset with required attributes
             if dicom_file is None:
                 raise DicomParseError("Failed to read DICOM file")
+
+            # pydicom re-opens deferred elements by the file object's name,
+            # which spooled/temporary files don't have; read them back from
+            # the object itself instead
+            if not isinstance(fp, str):
+                dicom_file.filename = fp
             
             # Check if it's a FileMetaDataset (incomplete file)
-            if hasattr(dicom_file, 'file_meta') and not hasattr(dicom_file, 'StudyInstanceUID'):
+            if hasattr(dicom_file, 'file_meta') and _IDENTIFIER_TAGS["study_id"] not in dicom_file:
                 raise DicomParseError(
                     "DICOM file appears to be incomplete or metadata-only. "
                     "Received FileMetaDataset instead of full Dataset."
                 )
             
-            metadata = self._extract_metadata(dicom_file)
-            metadata["raw_bytes"] = dicom_bytes
-
-            return DicomData(
-                study_id=self._get_tag_value(dicom_file, "StudyInstanceUID"),
-                series_id=self._get_tag_value(dicom_file, "SeriesInstanceUID"),
-                instance_id=self._get_tag_value(dicom_file, "SOPInstanceUID"),
-                patient_id=self._get_tag_value(dicom_file, "PatientID"),
-                patient_name=self._get_tag_value(dicom_file, "PatientName"),
-                study_date=self._get_tag_value(dicom_file, "StudyDate"),
-                metadata=metadata,
-            )
+            metadata = _extract_metadata(dicom_file)
+            # Keep the parsed dataset so extract_pixel_array doesn't parse again;
+            # its deferred PixelData is read from the same source on demand
+            metadata["_dataset"] = dicom_file
+
+            identifiers = {
+                field: _get_tag_value(dicom_file, tag) for field, tag in _IDENTIFIER_TAGS.items()
+            }
+            return DicomData(**identifiers, metadata=metadata)
         except Exception as e:
             raise DicomParseError(f"Failed to parse DICOM file: {str(e)}") from e
 
@@ -110,69 +349,62 @@ class DicomParserService(IDicomParser):
             dicom_data: Parsed DICOM data
 
         Returns:
-            NumPy array of pixel data
+            NumPy array of pixel data in its stored dtype. For uncompressed
+            little-endian data this is a read-only view of PixelData (no copy
+            is made); call ``.copy()`` before modifying it in place.
 
         Raises:
             DicomParseError: If extraction fails, with detailed error message
         """
         try:
-            dicom_bytes = dicom_data.metadata.get("raw_bytes")
-            if dicom_bytes is None:
-                raise DicomParseError("Raw DICOM bytes not found in metadata")
-
-            # Try reading DICOM file
-            dicom_file = None
-            try:
-                dicom_file = pydicom.dcmread(BytesIO(dicom_bytes))
-            except Exception as e:
-                # If standard read fails, try with force=True
-                try:
-                    dicom_file = pydicom.dcmread(BytesIO(dicom_bytes), force=True)
-                except Exception as force_error:
-                    logger.error(f"DICOM read failed: {str(e)}. Force read also failed: {str(force_error)}")
-                    logger.debug(traceback.format_exc())
-                    raise DicomParseError(
-                        f"Failed to read DICOM file: {str(e)}. "
-                        f"Force parsing also failed: {str(force_error)}"
-                    )
-            
+            dicom_file = dicom_data.metadata.get("_dataset")
             if dicom_file is None:
-                raise DicomParseError("Failed to read DICOM file")
+                raise DicomParseError("Parsed DICOM dataset not found in metadata")
             
             # Check for pixel data
-            if not hasattr(dicom_file, 'PixelData') and not hasattr(dicom_file, 'pixel_array'):
+            if _PIXEL_DATA_TAG not in dicom_file and not hasattr(dicom_file, 'pixel_array'):
                 raise DicomParseError(
                     "DICOM file does not contain pixel data. "
                     "This may be a metadata-only file."
                 )
             
-            # Get transfer syntax to diagnose compression issues
-            transfer_syntax = getattr(dicom_file, 'file_meta', {}).get('TransferSyntaxUID', 'Unknown') if hasattr(dicom_file, 'file_meta') else 'Unknown'
+            # Get transfer syntax once; it picks the decode path and is
+            # reported when decoding fails
+            transfer_syntax = _get_transfer_syntax(dicom_file)
             
             # Try to extract pixel array
+            handler_name = None
             try:
-                pixel_array = dicom_file.pixel_array
+                # Uncompressed CT is viewed in place; everything else goes
+                # through pydicom's pixel handlers
+                pixel_array = _read_native_pixels(dicom_file, transfer_syntax)
+                if pixel_array is None:
+                    handler_name = _decode_compressed_pixels(dicom_file, transfer_syntax)
+                    pixel_array = dicom_file.pixel_array
             except Exception as pixel_error:
                 # Provide detailed error message based on transfer syntax
-                error_msg = f"Failed to extract pixel array: {str(pixel_error)}"
+                error_text = str(pixel_error)
+                error_msg = f"Failed to extract pixel array: {error_text}"
+                if handler_name:
+                    error_msg += f" (handler: {handler_name})"
                 
                 # Check if it's a compression issue
-                if 'compressed' in str(pixel_error).lower() or 'jpeg' in str(pixel_error).lower() or 'decompress' in str(pixel_error).lower():
+                if _COMPRESSION_ERROR_RE.search(error_text):
                     error_msg += (
                         f"\n\n⚠️ PIXEL DECODING ERROR - Compressed DICOM detected!\n"
-                        f"Transfer Syntax: {transfer_syntax}\n"
+                        f"Transfer Syntax: {transfer_syntax or 'Unknown'}\n"
                         f"This DICOM uses compressed pixel data (JPEG/JPEG-LS/JPEG2000).\n"
                         f"Install pixel decoding libraries:\n"
                         f"  pip install pylibjpeg pylibjpeg-libjpeg pylibjpeg-openjpeg\n"
                         f"OR:\n"
                         f"  pip install gdcm\n"
-                        f"\nCurrent error: {type(pixel_error).__name__}: {str(pixel_error)}"
+                        f"\nCurrent error: {type(pixel_error).__name__}: {error_text}"
                     )
                     logger.error(error_msg)
-                    logger.debug(traceback.format_exc())
+                    logger.debug("Pixel extraction traceback", exc_info=True)
                 else:
-                    logger.error(f"Pixel extraction error: {str(pixel_error)}")
-                    logger.debug(traceback.format_exc())
+                    logger.error("Pixel extraction error: %s", pixel_error)
+                    logger.debug("Pixel extraction traceback", exc_info=True)
                 
                 raise DicomParseError(error_msg) from pixel_error
 
@@ -182,14 +414,16 @@ class DicomParserService(IDicomParser):
                     "The DICOM file may be corrupted or incomplete."
                 )
 
-            return pixel_array.astype(np.float32)
+            # Keep the stored dtype (typically 16-bit for CT); normalize_image
+            # does the float32 cast, so the volume is only upcast once
+            return np.ascontiguousarray(pixel_array)
         except DicomParseError:
             # Re-raise DicomParseError as-is (already has good error message)
             raise
         except Exception as e:
             # Catch any other exceptions and provide full traceback
-            logger.error(f"Unexpected error extracting pixel array: {str(e)}")
-            logger.debug(traceback.format_exc())
+            logger.error("Unexpected error extracting pixel array: %s", e)
+            logger.debug("Pixel extraction traceback", exc_info=True)
             raise DicomParseError(
                 f"Failed to extract pixel array: {str(e)}. "
                 f"See logs for full traceback."
@@ -208,54 +442,16 @@ class DicomParserService(IDicomParser):
         if image.size == 0:
             return image
 
-        min_val = np.min(image)
-        max_val = np.max(image)
-
-        if max_val == min_val:
-            return np.zeros_like(image)
-
-        normalized = (image - min_val) / (max_val - min_val)
-        return normalized.astype(np.float32)
-
-    def _get_tag_value(self, dicom_file: pydicom.Dataset, tag_name: str) -> str | None:
-        """
-        Get DICOM tag value safely.
-
-        Args:
-            dicom_file: Pydicom dataset
-            tag_name: Name of the DICOM tag
+        # Reduce in the stored dtype (half the bytes of float32 for 16-bit CT)
+        # and fuse the float32 conversion into the subtraction, so the volume
+        # is written once and rescaled in place
+        min_val = image.min()
+        span = float(image.max()) - float(min_val)
 
-        Returns:
-            Tag value as string or None if not found
-        """
-        try:
-            tag_value = getattr(dicom_file, tag_name, None)
-            if tag_value is None:
-                return None
+        if span == 0:
+            return np.zeros(image.shape, dtype=np.float32)
 
-            if isinstance(tag_value, pydicom.multival.MultiValue):
-                return str(tag_value[0]) if len(tag_value) > 0 else None
-
-            return str(tag_value)
-        except Exception:
-            return None
-
-    def _extract_metadata(self, dicom_file: pydicom.Dataset) -> Dict[str, Any]:
-        """
-        Extract metadata from DICOM file.
-
-        Args:
-            dicom_file: Pydicom dataset
-
-        Returns:
-            Dictionary with metadata
-        """
-        metadata = {
-            "modality": getattr(dicom_file, "Modality", None),
-            "slice_thickness": getattr(dicom_file, "SliceThickness", None),
-            "pixel_spacing": getattr(dicom_file, "PixelSpacing", None),
-            "rows": getattr(dicom_file, "Rows", None),
-            "columns": getattr(dicom_file, "Columns", None),
-        }
-
-        return metadata
+        normalized = np.empty(image.shape, dtype=np.float32)
+        np.subtract(image, min_val, out=normalized, dtype=np.float32)
+        normalized *= np.float32(1.0 / span)
+        return normalized
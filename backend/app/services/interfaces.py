@@ -1,9 +1,10 @@
 """Abstract base classes (interfaces) following SOLID principles."""
 
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, List, Optional
 
 from backend.app.models.domain import DiagnosisResult, DicomData, Series, Study
+from backend.app.utils.dicom_utils import DicomSource
 
 if TYPE_CHECKING:
     import numpy as np
@@ -15,12 +16,14 @@ class IKheopsClient(ABC):
     """Interface for Kheops DICOM client following Interface Segregation Principle."""
 
     @abstractmethod
-    def fetch_studies(self, album_token: str) -> List[Study]:
+    def fetch_studies(self, album_token: str, limit: Optional[int] = None, offset: int = 0) -> List[Study]:
         """
         Fetch all studies from a Kheops album.
 
         Args:
             album_token: Token for album authentication
+            limit: Maximum number of studies to return (all if None)
+            offset: Number of studies to skip
 
         Returns:
             List of Study objects
@@ -90,12 +93,12 @@ class IDicomParser(ABC):
     """Interface for DICOM file parsing."""
 
     @abstractmethod
-    def parse_dicom_file(self, dicom_bytes: bytes) -> DicomData:
+    def parse_dicom_file(self, dicom_source: DicomSource) -> DicomData:
         """
         Parse DICOM file bytes into DicomData object.
 
         Args:
-            dicom_bytes: Raw DICOM file bytes
+            dicom_source: Raw DICOM bytes, a seekable binary file object or a file path
 
         Returns:
             Parsed DicomData object
@@ -114,7 +117,8 @@ class IDicomParser(ABC):
             dicom_data: Parsed DICOM data
 
         Returns:
-            NumPy array of pixel data
+            NumPy array of pixel data in its stored dtype; it may be a
+            read-only view, so callers copy it before modifying it in place
 
         Raises:
             DicomParseError: If extraction fails
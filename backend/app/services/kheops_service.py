@@ -1,15 +1,75 @@
 """Kheops service for fetching DICOM data using album tokens."""
 
+import asyncio
 import json
-from typing import List
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from backend.app.config import Settings, get_settings
 from backend.app.models.domain import Series, Study
 from backend.app.services.interfaces import IKheopsClient
+from backend.app.utils.cache import TTLCache
+from backend.app.utils.dicom_utils import looks_like_dicom
 from backend.app.utils.exceptions import KheopsAPIError
 
+# Connection pooling for the Kheops host: keep-alive connections are reused
+# across requests, and transient gateway errors are retried with backoff
+_POOL_CONNECTIONS = 4
+_POOL_MAXSIZE = 32
+_RETRY_POLICY = Retry(total=3, backoff_factor=0.2, status_forcelist=(502, 503, 504))
+
+# Response encodings urllib3 can decode here: gzip and deflate, plus br only
+# when a brotli package is installed (advertising it otherwise would leave
+# undecodable bodies)
+_ACCEPT_ENCODING = requests.utils.DEFAULT_ACCEPT_ENCODING
+
+# Downloads are streamed in chunks of this size; the first bytes decide
+# whether the rest of the body is worth reading
+_DOWNLOAD_CHUNK_SIZE = 1 << 16
+_DOWNLOAD_SNIFF_SIZE = 132  # preamble + DICM signature
+
+# Leading bytes of a failed download's body kept for the error diagnosis
+_ERROR_PREVIEW_SIZE = 200
+
+# Bodies larger than this must carry the DICM signature to be accepted
+_UNSIGNED_DICOM_MAX_SIZE = 10000
+
+# Body prefixes of JSON metadata and HTML error pages returned instead of DICOM
+_TEXT_BODY_PREFIXES = (b"{", b"[", b"<!doctype", b"<!DOCTYPE", b"<html", b"<HTML")
+
+# Printable ASCII bytes; deleting them with bytes.translate leaves the
+# non-printable ones, counted in C rather than byte by byte
+_PRINTABLE_ASCII = bytes(range(32, 127))
+
+# Accept headers tried for each download URL, most specific first
+_DOWNLOAD_ACCEPT = ("application/dicom", "application/octet-stream", "*/*")
+_WADO_DOWNLOAD_ACCEPT = ("application/dicom", "application/octet-stream")
+
+# Stand-in for DICOM JSON attributes missing from a QIDO-RS result
+_EMPTY_TAG = MappingProxyType({})
+
+# DICOM JSON attribute keys (group+element) read from QIDO-RS responses
+_TAG_STUDY_UID = "0020000D"
+_TAG_STUDY_DATE = "00080020"
+_TAG_STUDY_DESCRIPTION = "00081030"
+_TAG_PATIENT_ID = "00100020"
+_TAG_PATIENT_NAME = "00100010"
+_TAG_SERIES_UID = "0020000E"
+_TAG_SERIES_DESCRIPTION = "0008103E"
+_TAG_MODALITY = "00080060"
+_TAG_SOP_INSTANCE_UID = "00080018"
+_TAG_RETRIEVE_URL = "00081190"
+
+# QIDO-RS attributes requested when listing every instance of a study at once
+_STUDY_INSTANCES_INCLUDEFIELD = ",".join((_TAG_SERIES_UID, _TAG_SOP_INSTANCE_UID, _TAG_RETRIEVE_URL))
+
 
 class KheopsService(IKheopsClient):
     """Service for interacting with Kheops DICOMweb API."""
@@ -23,6 +83,29 @@ class KheopsService(IKheopsClient):
         """
         self.settings = settings or get_settings()
         self.base_url = self.settings.kheops_base_url.rstrip("/")
+        # QIDO-RS listings keyed by album token and query, so repeated UI
+        # refreshes don't re-query Kheops
+        self._metadata_cache = TTLCache(
+            maxsize=self.settings.kheops_metadata_cache_size,
+            ttl=self.settings.kheops_metadata_ttl_seconds,
+        )
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=_POOL_CONNECTIONS, pool_maxsize=_POOL_MAXSIZE, max_retries=_RETRY_POLICY
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def close(self) -> None:
+        """Close the pooled session and its keep-alive connections."""
+        self._session.close()
+
+    def __del__(self):
+        """Release pooled connections when the service is garbage collected."""
+        session = getattr(self, "_session", None)
+        if session is not None:
+            session.close()
 
     def _get_headers(self, album_token: str) -> dict:
         """
@@ -37,6 +120,7 @@ class KheopsService(IKheopsClient):
         return {
             "Authorization": f"Bearer {album_token}",
             "Content-Type": "application/json",
+            "Accept-Encoding": _ACCEPT_ENCODING,
         }
 
     def _make_request(self, method: str, url: str, album_token: str, **kwargs) -> requests.Response:
@@ -59,43 +143,61 @@ class KheopsService(IKheopsClient):
         headers.update(kwargs.pop("headers", {}))
 
         try:
-            response = requests.request(method, url, headers=headers, timeout=30, **kwargs)
+            response = self._session.request(method, url, headers=headers, timeout=30, **kwargs)
             response.raise_for_status()
             return response
         except requests.exceptions.RequestException as e:
             raise KheopsAPIError(f"Kheops API request failed: {str(e)}") from e
 
-    def _parse_dicom_value(self, value: any) -> str | None:
+    @staticmethod
+    def _first_value(tag: dict, default: str | None = None) -> Any:
         """
-        Parse DICOM value which can be a string, list, or dict.
+        Get the first entry of a DICOM JSON tag's "Value" list.
 
         Args:
-            value: DICOM value (can be string, list, or dict)
+            tag: DICOM JSON attribute, e.g. {"vr": "UI", "Value": [...]}
+            default: Returned when the tag has no values
 
         Returns:
-            String value or None
+            First value or default
         """
-        if value is None:
-            return None
+        values = tag.get("Value")
+        return values[0] if values else default
 
-        if isinstance(value, str):
-            return value
+    @staticmethod
+    def _parse_dicom_value(value: Any) -> str | None:
+        """
+        Parse DICOM value which can be a string, list, or dict.
 
-        if isinstance(value, list):
-            if len(value) > 0:
-                return self._parse_dicom_value(value[0])
-            return None
+        Args:
+            value: DICOM value (can be string, list, or dict)
 
-        if isinstance(value, dict):
-            if "Alphabetic" in value:
-                return value["Alphabetic"]
-            if "Value" in value:
-                return self._parse_dicom_value(value["Value"])
-            return str(value)
+        Returns:
+            String value or None
+        """
+        # Unwrap nested list/"Value" containers iteratively rather than recursing
+        while True:
+            if value is None or isinstance(value, str):
+                return value
+
+            if isinstance(value, list):
+                if not value:
+                    return None
+                value = value[0]
+                continue
+
+            if isinstance(value, dict):
+                if "Alphabetic" in value:
+                    return value["Alphabetic"]
+                if "Value" in value:
+                    value = value["Value"]
+                    continue
+                return str(value)
 
-        return str(value) if value else None
+            return str(value) if value else None
 
-    def _parse_patient_name(self, name_value: any) -> str | None:
+    @staticmethod
+    def _parse_patient_name(name_value: Any) -> str | None:
         """
         Parse DICOM patient name which can be string or dict with components.
 
@@ -105,29 +207,30 @@ class KheopsService(IKheopsClient):
         Returns:
             Patient name as string or None
         """
-        if name_value is None:
-            return None
-
-        if isinstance(name_value, str):
-            return name_value
-
-        if isinstance(name_value, list) and len(name_value) > 0:
-            name_value = name_value[0]
-
-        if isinstance(name_value, dict):
-            if "Alphabetic" in name_value:
-                return name_value["Alphabetic"]
-            if "Value" in name_value:
-                return self._parse_patient_name(name_value["Value"])
+        while True:
+            if name_value is None or isinstance(name_value, str):
+                return name_value
+
+            if isinstance(name_value, list) and len(name_value) > 0:
+                name_value = name_value[0]
+
+            if isinstance(name_value, dict):
+                if "Alphabetic" in name_value:
+                    return name_value["Alphabetic"]
+                if "Value" in name_value:
+                    name_value = name_value["Value"]
+                    continue
 
-        return str(name_value) if name_value else None
+            return str(name_value) if name_value else None
 
-    def fetch_studies(self, album_token: str) -> List[Study]:
+    def fetch_studies(self, album_token: str, limit: Optional[int] = None, offset: int = 0) -> List[Study]:
         """
         Fetch all studies from a Kheops album.
 
         Args:
             album_token: Token for album authentication
+            limit: Maximum number of studies to return (all if None)
+            offset: Number of studies to skip
 
         Returns:
             List of Study objects
@@ -135,37 +238,45 @@ class KheopsService(IKheopsClient):
         Raises:
             KheopsAPIError: If API request fails
         """
+        cache_key = ("studies", album_token, limit, offset)
+        cached = self._metadata_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+
         url = f"{self.base_url}/api/studies"
-        response = self._make_request("GET", url, album_token)
+        # QIDO-RS paging parameters, only sent when paging is requested
+        params = {}
+        if limit is not None:
+            params["limit"] = limit
+        if offset:
+            params["offset"] = offset
+        response = self._make_request("GET", url, album_token, params=params or None)
 
         try:
-            studies_data = response.json()
+            studies_data = orjson.loads(response.content)
             studies = []
+            # Bound once rather than looked up on every iteration
+            parse_value = self._parse_dicom_value
+            first_value = self._first_value
+            empty = _EMPTY_TAG
 
             for study_data in studies_data:
-                study_id_tag = study_data.get("0020000D", {})
-                study_date_tag = study_data.get("00080020", {})
-                study_desc_tag = study_data.get("00081030", {})
-                patient_id_tag = study_data.get("00100020", {})
-                patient_name_tag = study_data.get("00100010", {})
-
-                study_id_value = study_id_tag.get("Value", [""])
-                study_date_value = study_date_tag.get("Value") if study_date_tag.get("Value") else None
-                study_desc_value = study_desc_tag.get("Value") if study_desc_tag.get("Value") else None
-                patient_id_value = patient_id_tag.get("Value") if patient_id_tag.get("Value") else None
-                patient_name_value = patient_name_tag.get("Value") if patient_name_tag.get("Value") else None
-
                 study = Study(
-                    study_id=self._parse_dicom_value(study_id_value[0] if study_id_value else ""),
-                    study_date=self._parse_dicom_value(study_date_value[0] if study_date_value else None),
-                    study_description=self._parse_dicom_value(study_desc_value[0] if study_desc_value else None),
-                    patient_id=self._parse_dicom_value(patient_id_value[0] if patient_id_value else None),
-                    patient_name=self._parse_patient_name(patient_name_value),
+                    study_id=parse_value(first_value(study_data.get(_TAG_STUDY_UID, empty), "")),
+                    study_date=parse_value(first_value(study_data.get(_TAG_STUDY_DATE, empty))),
+                    study_description=parse_value(
+                        first_value(study_data.get(_TAG_STUDY_DESCRIPTION, empty))
+                    ),
+                    patient_id=parse_value(first_value(study_data.get(_TAG_PATIENT_ID, empty))),
+                    patient_name=self._parse_patient_name(
+                        study_data.get(_TAG_PATIENT_NAME, empty).get("Value") or None
+                    ),
                 )
                 studies.append(study)
 
+            self._metadata_cache.set(cache_key, tuple(studies))
             return studies
-        except (json.JSONDecodeError, KeyError, IndexError) as e:
+        except (json.JSONDecodeError, orjson.JSONDecodeError, KeyError, IndexError) as e:
             raise KheopsAPIError(f"Failed to parse studies response: {str(e)}") from e
 
     def fetch_series(self, album_token: str, study_id: str) -> List[Series]:
@@ -182,28 +293,56 @@ class KheopsService(IKheopsClient):
         Raises:
             KheopsAPIError: If API request fails
         """
+        cache_key = ("series", album_token, study_id)
+        cached = self._metadata_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+
         url = f"{self.base_url}/api/studies/{study_id}/series"
         response = self._make_request("GET", url, album_token)
 
         try:
-            series_data = response.json()
+            series_data = orjson.loads(response.content)
             series_list = []
 
             for series_item in series_data:
                 series = Series(
-                    series_id=series_item.get("0020000E", {}).get("Value", [""])[0],
+                    series_id=series_item.get(_TAG_SERIES_UID, {}).get("Value", [""])[0],
                     study_id=study_id,
-                    series_description=series_item.get("0008103E", {}).get("Value", [""])[0] if series_item.get("0008103E") else None,
-                    modality=series_item.get("00080060", {}).get("Value", [""])[0] if series_item.get("00080060") else None,
-                    instance_count=len(series_item.get("00081190", {}).get("Value", [])) if series_item.get("00081190") else None,
+                    series_description=series_item.get(_TAG_SERIES_DESCRIPTION, {}).get("Value", [""])[0] if series_item.get(_TAG_SERIES_DESCRIPTION) else None,
+                    modality=series_item.get(_TAG_MODALITY, {}).get("Value", [""])[0] if series_item.get(_TAG_MODALITY) else None,
+                    instance_count=len(series_item.get(_TAG_RETRIEVE_URL, {}).get("Value", [])) if series_item.get(_TAG_RETRIEVE_URL) else None,
                 )
                 series_list.append(series)
 
+            self._metadata_cache.set(cache_key, tuple(series_list))
             return series_list
-        except (json.JSONDecodeError, KeyError, IndexError) as e:
+        except (json.JSONDecodeError, orjson.JSONDecodeError, KeyError, IndexError) as e:
             raise KheopsAPIError(f"Failed to parse series response: {str(e)}") from e
 
-    def fetch_instances(self, album_token: str, study_id: str, series_id: str) -> List[dict]:
+    @staticmethod
+    def _parse_instance(instance_item: dict) -> Optional[dict]:
+        """
+        Build an instance dictionary from a QIDO-RS instance entry.
+
+        Args:
+            instance_item: DICOM JSON attributes of one instance
+
+        Returns:
+            Instance dictionary with id and optional url, or None without an id
+        """
+        instance_id = instance_item.get(_TAG_SOP_INSTANCE_UID, {}).get("Value", [""])[0]
+        if not instance_id:
+            return None
+        instance_url = instance_item.get(_TAG_RETRIEVE_URL, {}).get("Value", [""])[0]
+        return {
+            "instance_id": instance_id,
+            "instance_url": instance_url if instance_url else None
+        }
+
+    def fetch_instances(
+        self, album_token: str, study_id: str, series_id: str, batched: bool = False
+    ) -> List[dict]:
         """
         Fetch all instances within a series.
 
@@ -211,6 +350,9 @@ class KheopsService(IKheopsClient):
             album_token: Token for album authentication
             study_id: ID of the study
             series_id: ID of the series
+            batched: Serve the series from a single study-wide listing (see
+                fetch_all_instances_for_study), for callers iterating many
+                series of the same study
 
         Returns:
             List of instance dictionaries with id and optional url
@@ -218,26 +360,194 @@ class KheopsService(IKheopsClient):
         Raises:
             KheopsAPIError: If API request fails
         """
+        if batched:
+            return self.fetch_all_instances_for_study(album_token, study_id).get(series_id, [])
+
+        cache_key = ("instances", album_token, study_id, series_id)
+        cached = self._metadata_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+
         url = f"{self.base_url}/api/studies/{study_id}/series/{series_id}/instances"
         response = self._make_request("GET", url, album_token)
 
         try:
-            instances_data = response.json()
+            instances_data = orjson.loads(response.content)
             instances = []
 
             for instance_item in instances_data:
-                instance_id = instance_item.get("00080018", {}).get("Value", [""])[0]
-                instance_url = instance_item.get("00081190", {}).get("Value", [""])[0]
-                if instance_id:
-                    instances.append({
-                        "instance_id": instance_id,
-                        "instance_url": instance_url if instance_url else None
-                    })
+                instance = self._parse_instance(instance_item)
+                if instance is not None:
+                    instances.append(instance)
 
+            self._metadata_cache.set(cache_key, tuple(instances))
             return instances
-        except (json.JSONDecodeError, KeyError, IndexError) as e:
+        except (json.JSONDecodeError, orjson.JSONDecodeError, KeyError, IndexError) as e:
             raise KheopsAPIError(f"Failed to parse instances response: {str(e)}") from e
 
+    def fetch_all_instances_for_study(self, album_token: str, study_id: str) -> Dict[str, List[dict]]:
+        """
+        Fetch the instances of every series in a study with a single request.
+
+        Uses the study-level QIDO-RS instances query, so building a full
+        series map costs one round-trip instead of one per series.
+
+        Args:
+            album_token: Token for album authentication
+            study_id: ID of the study
+
+        Returns:
+            Mapping of series ID to its list of instance dictionaries with id
+            and optional url
+
+        Raises:
+            KheopsAPIError: If API request fails
+        """
+        cache_key = ("study_instances", album_token, study_id)
+        cached = self._metadata_cache.get(cache_key)
+        if cached is not None:
+            return {series_id: list(instances) for series_id, instances in cached.items()}
+
+        url = f"{self.base_url}/api/studies/{study_id}/instances"
+        response = self._make_request(
+            "GET", url, album_token, params={"includefield": _STUDY_INSTANCES_INCLUDEFIELD}
+        )
+
+        try:
+            instances_data = orjson.loads(response.content)
+            instances_by_series = defaultdict(list)
+
+            for instance_item in instances_data:
+                series_id = self._first_value(instance_item.get(_TAG_SERIES_UID, _EMPTY_TAG))
+                instance = self._parse_instance(instance_item)
+                if series_id and instance is not None:
+                    instances_by_series[series_id].append(instance)
+
+            self._metadata_cache.set(
+                cache_key,
+                {series_id: tuple(instances) for series_id, instances in instances_by_series.items()},
+            )
+            return dict(instances_by_series)
+        except (json.JSONDecodeError, orjson.JSONDecodeError, KeyError, IndexError) as e:
+            raise KheopsAPIError(f"Failed to parse study instances response: {str(e)}") from e
+
+    def _read_binary_body(self, response: requests.Response) -> bytes | None:
+        """
+        Read a streamed download body unless it starts like a text document.
+
+        Args:
+            response: Response opened with stream=True
+
+        Returns:
+            Response body, or None for JSON metadata, an HTML error page or a
+            large body without a DICM signature (whose remaining body is never
+            downloaded)
+        """
+        chunks = response.iter_content(chunk_size=_DOWNLOAD_CHUNK_SIZE)
+        parts = []
+        received = 0
+        for chunk in chunks:
+            parts.append(chunk)
+            received += len(chunk)
+            if received >= _DOWNLOAD_SNIFF_SIZE:
+                break
+
+        head = b"".join(parts)
+
+        # Reject JSON metadata and HTML error pages immediately; a single
+        # startswith over the prefix tuple compares them all in C
+        if head.startswith(_TEXT_BODY_PREFIXES):
+            return None
+
+        # A large body without the DICM signature would be rejected once
+        # downloaded, so decide from the declared length instead
+        declared_length = response.headers.get("Content-Length", "")
+        if (
+            declared_length.isdigit()
+            and int(declared_length) > _UNSIGNED_DICOM_MAX_SIZE
+            and not looks_like_dicom(head)
+        ):
+            return None
+
+        parts.extend(chunks)
+        return b"".join(parts)
+
+    def download_series(
+        self, album_token: str, study_id: str, series_id: str, instances: List[dict], max_workers: Optional[int] = None
+    ) -> List[bytes]:
+        """
+        Download several DICOM instances of a series concurrently.
+
+        Downloads overlap on the pooled session, so a series costs roughly
+        one round trip per ``max_workers`` instances instead of one each.
+
+        Args:
+            album_token: Token for album authentication
+            study_id: ID of the study
+            series_id: ID of the series
+            instances: Instance dictionaries as returned by fetch_instances
+            max_workers: Concurrent downloads (defaults to settings.kheops_download_concurrency)
+
+        Returns:
+            DICOM files as bytes, in the order of ``instances``
+
+        Raises:
+            KheopsAPIError: If any download fails
+        """
+        max_workers = max_workers or self.settings.kheops_download_concurrency
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(
+                executor.map(
+                    lambda instance: self.download_instance(
+                        album_token, study_id, series_id, instance["instance_id"], instance.get("instance_url")
+                    ),
+                    instances,
+                )
+            )
+
+    async def download_series_async(
+        self,
+        album_token: str,
+        study_id: str,
+        series_id: str,
+        instances: Optional[List[dict]] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> List[bytes]:
+        """
+        Download the DICOM instances of a series from async code.
+
+        Each download runs the blocking download_instance in a worker thread
+        on the pooled session, so the event loop stays free while at most
+        ``max_concurrency`` downloads are in flight.
+
+        Args:
+            album_token: Token for album authentication
+            study_id: ID of the study
+            series_id: ID of the series
+            instances: Instance dictionaries as returned by fetch_instances
+                (fetched first when omitted)
+            max_concurrency: Concurrent downloads (defaults to settings.kheops_download_concurrency)
+
+        Returns:
+            DICOM files as bytes, in the order of ``instances``
+
+        Raises:
+            KheopsAPIError: If the instance listing or any download fails
+        """
+        if instances is None:
+            instances = await asyncio.to_thread(self.fetch_instances, album_token, study_id, series_id)
+
+        slots = asyncio.Semaphore(max_concurrency or self.settings.kheops_download_concurrency)
+
+        async def download(instance: dict) -> bytes:
+            async with slots:
+                return await asyncio.to_thread(
+                    self.download_instance,
+                    album_token, study_id, series_id, instance["instance_id"], instance.get("instance_url"),
+                )
+
+        return list(await asyncio.gather(*(download(instance) for instance in instances)))
+
     def download_instance(self, album_token: str, study_id: str, series_id: str, instance_id: str, instance_url: str = None) -> bytes:
         """
         Download a DICOM instance as bytes.
@@ -262,44 +572,55 @@ class KheopsService(IKheopsClient):
         
         # If we have the instance URL from metadata, try it first
         if instance_url:
-            url_patterns.append((instance_url, ["application/dicom", "application/octet-stream", "*/*"]))
-            url_patterns.append((f"{instance_url}/file", ["application/dicom", "application/octet-stream", "*/*"]))
+            url_patterns.append((instance_url, _DOWNLOAD_ACCEPT))
+            url_patterns.append((f"{instance_url}/file", _DOWNLOAD_ACCEPT))
         
         # Standard DICOMweb patterns
         base_url_pattern = f"{self.base_url}/api/studies/{study_id}/series/{series_id}/instances/{instance_id}"
-        url_patterns.append((f"{base_url_pattern}/file", ["application/dicom", "application/octet-stream", "*/*"]))
-        url_patterns.append((base_url_pattern, ["application/dicom", "application/octet-stream", "*/*"]))
+        url_patterns.append((f"{base_url_pattern}/file", _DOWNLOAD_ACCEPT))
+        url_patterns.append((base_url_pattern, _DOWNLOAD_ACCEPT))
         
         # WADO-RS style (without /api prefix)
         wado_pattern = f"{self.base_url}/studies/{study_id}/series/{series_id}/instances/{instance_id}"
-        url_patterns.append((f"{wado_pattern}/file", ["application/dicom", "application/octet-stream"]))
-        url_patterns.append((wado_pattern, ["application/dicom", "application/octet-stream"]))
+        url_patterns.append((f"{wado_pattern}/file", _WADO_DOWNLOAD_ACCEPT))
+        url_patterns.append((wado_pattern, _WADO_DOWNLOAD_ACCEPT))
 
         last_error = None
+        last_error_preview = b""
         attempted_urls = []
         
         for url, accept_options in url_patterns:
             for accept_header in accept_options:
+                error_preview = b""
                 try:
                     test_headers = headers.copy()
                     test_headers["Accept"] = accept_header
                     attempted_urls.append(f"{url} (Accept: {accept_header})")
                     
-                    response = requests.get(url, headers=test_headers, timeout=60)
-                    response.raise_for_status()
-                    
-                    # Check if response is actually DICOM (binary)
-                    content_type = response.headers.get("Content-Type", "").lower()
-                    content_length = len(response.content)
-                    content_start = response.content[:100] if content_length > 100 else response.content
-                    
-                    # Reject JSON metadata immediately
-                    if content_start.startswith(b"{") or content_start.startswith(b"["):
+                    with self._session.get(url, headers=test_headers, timeout=60, stream=True) as response:
+                        try:
+                            response.raise_for_status()
+                        except requests.exceptions.HTTPError:
+                            # The unread body is discarded when the streamed response
+                            # closes, so keep its start for the diagnosis below
+                            error_preview = next(
+                                response.iter_content(chunk_size=_ERROR_PREVIEW_SIZE), b""
+                            )
+                            raise
+                        content_type = response.headers.get("Content-Type", "").lower()
+                        # JSON metadata or an HTML page is declared in the headers,
+                        # so the body doesn't need to be read at all
+                        if "json" in content_type or "html" in content_type:
+                            content = None
+                        else:
+                            content = self._read_binary_body(response)
+
+                    # JSON metadata or an HTML error page, rejected before the body was read
+                    if content is None:
                         continue
                     
-                    # Reject HTML error pages
-                    if content_start.startswith(b"<!doctype") or content_start.startswith(b"<html"):
-                        continue
+                    # Check if response is actually DICOM (binary)
+                    content_length = len(content)
                     
                     # DICOM files are typically binary and larger than metadata
                     # They should start with DICM (128 bytes offset) or have binary content
@@ -307,15 +628,15 @@ class KheopsService(IKheopsClient):
                         # Check for DICOM signature (at offset 128) - this is the most reliable indicator
                         if content_length >= 132:
                             # Check for DICM signature at offset 128
-                            if len(response.content) >= 132 and response.content[128:132] == b"DICM":
-                                return response.content
+                            if len(content) >= 132 and content[128:132] == b"DICM":
+                                return content
                             # Also check if it starts with DICM (some files have it at the start)
-                            if response.content[:4] == b"DICM":
-                                return response.content
+                            if content[:4] == b"DICM":
+                                return content
                         
                         # For large files (>10KB), REQUIRE DICM signature - don't trust content-type alone
                         # Kheops may return metadata with misleading content-types
-                        if content_length > 10000:
+                        if content_length > _UNSIGNED_DICOM_MAX_SIZE:
                             # Large files without DICM signature are likely not valid DICOM
                             # Skip this URL pattern and try the next one
                             continue
@@ -329,33 +650,26 @@ class KheopsService(IKheopsClient):
                         ):
                             # Only accept if it looks like binary data (not text/metadata)
                             # Check if first 100 bytes contain mostly non-printable characters
-                            check_bytes = min(100, len(response.content))
-                            non_printable = sum(1 for b in response.content[:check_bytes] if b < 32 or b > 126)
+                            check_bytes = min(100, len(content))
+                            non_printable = len(content[:check_bytes].translate(None, _PRINTABLE_ASCII))
                             if non_printable > (check_bytes * 0.5):  # More than 50% non-printable = likely binary
-                                return response.content
-                    
-                    # If it's JSON, this is metadata, not the file
-                    if "application/json" in content_type or "application/dicom+json" in content_type:
-                        continue
-                        
+                                return content
+
+
                 except requests.exceptions.RequestException as e:
                     last_error = e
+                    last_error_preview = error_preview
                     continue
 
         # If all URLs failed, check what we actually received (if we got any response)
         # This helps diagnose if Kheops is returning JSON metadata instead of binary files
         diagnostic_info = ""
-        if last_error and hasattr(last_error, 'response') and last_error.response is not None:
-            try:
-                content_preview = last_error.response.content[:200]
-                if content_preview.startswith(b"{") or content_preview.startswith(b"["):
-                    diagnostic_info = (
-                        "\n\nDIAGNOSIS: Kheops API is returning JSON metadata instead of binary DICOM files. "
-                        "This suggests the demo instance may not support direct file downloads via DICOMweb API. "
-                        "SOLUTION: Use the /api/inference/from-dicom endpoint with manually downloaded DICOM files."
-                    )
-            except Exception:
-                pass
+        if last_error_preview.lstrip().startswith((b"{", b"[")):
+            diagnostic_info = (
+                "\n\nDIAGNOSIS: Kheops API is returning JSON metadata instead of binary DICOM files. "
+                "This suggests the demo instance may not support direct file downloads via DICOMweb API. "
+                "SOLUTION: Use the /api/inference/from-dicom endpoint with manually downloaded DICOM files."
+            )
         
         error_details = "\n".join(f"  - {url}" for url in attempted_urls[:10])  # Show first 10
         if len(attempted_urls) > 10:
@@ -77,15 +77,6 @@ class LLMService(IReportGenerator):
         Returns:
             Formatted prompt string
         """
-        # #region agent log
-        import json
-        import time
-        try:
-            with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"D","location":"llm_service.py:70","message":"create_prompt entry","data":{"has_abnormalities":hasattr(diagnosis,'abnormalities'),"abnormalities_count":len(diagnosis.abnormalities) if hasattr(diagnosis,'abnormalities') else 0},"timestamp":int(time.time()*1000)})+'\n')
-        except:
-            pass
-        # #endregion
         abnormalities_str = ", ".join(diagnosis.abnormalities) if diagnosis.abnormalities else "None detected"
         confidence_str = ", ".join([f"{k}: {v:.2f}" for k, v in diagnosis.confidence_scores.items()])
 
@@ -112,13 +103,6 @@ Recommendations:
 
 Generate the report now:"""
 
-        # #region agent log
-        try:
-            with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"D","location":"llm_service.py:115","message":"create_prompt exit","data":{"prompt_length":len(prompt)},"timestamp":int(time.time()*1000)})+'\n')
-        except:
-            pass
-        # #endregion
         return prompt
 
     def generate_report(self, prompt: str) -> str:
@@ -131,13 +115,6 @@ Generate the report now:"""
         Returns:
             Generated report text
         """
-        # #region agent log
-        import json
-        import time
-        with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-            f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"D","location":"llm_service.py:117","message":"generate_report entry","data":{"initialized":self.initialized,"use_mock":self._use_mock,"base_url":self.base_url,"model_name":self.model_name},"timestamp":int(time.time()*1000)})+'\n')
-        # #endregion
-        
         # Try to initialize if not already done
         if not self.initialized and not self._use_mock:
             try:
@@ -149,10 +126,7 @@ Generate the report now:"""
         
         # Use mock report if Ollama is unavailable
         if self._use_mock or not self.initialized:
-            # #region agent log
-            with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"D","location":"llm_service.py:144","message":"Using mock report","data":{},"timestamp":int(time.time()*1000)})+'\n')
-            # #endregion
+            logger.debug("Ollama unavailable at %s, using mock report", self.base_url)
             return self._generate_mock_report(prompt)
 
         url = f"{self.base_url}/api/generate"
@@ -163,38 +137,18 @@ Generate the report now:"""
         }
 
         try:
-            # #region agent log
-            with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"D","location":"llm_service.py:151","message":"Before HTTP request","data":{"url":url},"timestamp":int(time.time()*1000)})+'\n')
-            # #endregion
             timeout = self.settings.llm_timeout
             with httpx.Client(timeout=float(timeout)) as client:
                 response = client.post(url, json=payload)
-                # #region agent log
-                with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                    f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"D","location":"llm_service.py:164","message":"After HTTP request","data":{"status_code":response.status_code},"timestamp":int(time.time()*1000)})+'\n')
-                # #endregion
                 response.raise_for_status()
                 result = response.json()
-                # #region agent log
-                with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                    f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"D","location":"llm_service.py:170","message":"After parse response","data":{"has_response":"response" in result},"timestamp":int(time.time()*1000)})+'\n')
-                # #endregion
                 return result.get("response", "")
         except (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadTimeout, ConnectionRefusedError) as e:
             # Connection failed or timeout, fallback to mock
             logger.warning(f"Ollama connection/timeout failed during generation: {e}. Using mock report.")
             self._use_mock = True
-            # #region agent log
-            with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"D","location":"llm_service.py:183","message":"Connection/timeout error, using mock","data":{"error_type":type(e).__name__},"timestamp":int(time.time()*1000)})+'\n')
-            # #endregion
             return self._generate_mock_report(prompt)
         except Exception as e:
-            # #region agent log
-            with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"D","location":"llm_service.py:193","message":"LLM generate_report exception","data":{"error_type":type(e).__name__,"error_msg":str(e)},"timestamp":int(time.time()*1000)})+'\n')
-            # #endregion
             raise LLMInitializationError(f"Failed to generate report: {str(e)}") from e
 
     def _generate_mock_report(self, prompt: str) -> str:
@@ -242,44 +196,17 @@ Note: This is a mock report generated for PoC testing. For real LLM-generated re
         Returns:
             Formatted ClinicalReport object
         """
-        # #region agent log
-        import json
-        import time
-        try:
-            with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"D","location":"llm_service.py:234","message":"format_report entry","data":{"raw_text_length":len(raw_text) if raw_text else 0},"timestamp":int(time.time()*1000)})+'\n')
-        except:
-            pass
-        # #endregion
-        try:
-            clinical_history = self._extract_section(raw_text, "Clinical History")
-            findings = self._extract_section(raw_text, "Findings")
-            impression = self._extract_section(raw_text, "Impression")
-            recommendations = self._extract_section(raw_text, "Recommendations")
-
-            report = ClinicalReport(
-                clinical_history=clinical_history,
-                findings=findings,
-                impression=impression,
-                recommendations=recommendations,
-            )
-            # #region agent log
-            try:
-                with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                    f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"D","location":"llm_service.py:254","message":"format_report exit","data":{"has_findings":hasattr(report,'findings'),"has_impression":hasattr(report,'impression')},"timestamp":int(time.time()*1000)})+'\n')
-            except:
-                pass
-            # #endregion
-            return report
-        except Exception as e:
-            # #region agent log
-            try:
-                with open('/Users/anirudh/Desktop/workspace/CT Brain Image Software/brain_ct_report_generator/.cursor/debug.log', 'a') as f:
-                    f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"D","location":"llm_service.py:257","message":"format_report exception","data":{"error_type":type(e).__name__,"error_msg":str(e)},"timestamp":int(time.time()*1000)})+'\n')
-            except:
-                pass
-            # #endregion
-            raise
+        clinical_history = self._extract_section(raw_text, "Clinical History")
+        findings = self._extract_section(raw_text, "Findings")
+        impression = self._extract_section(raw_text, "Impression")
+        recommendations = self._extract_section(raw_text, "Recommendations")
+
+        return ClinicalReport(
+            clinical_history=clinical_history,
+            findings=findings,
+            impression=impression,
+            recommendations=recommendations,
+        )
 
     def create_chunk_summary_prompt(self, chunk_diagnosis: DiagnosisResult, chunk_index: int, total_chunks: int, previous_summaries: List[str] = None) -> str:
         """
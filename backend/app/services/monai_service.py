@@ -1,6 +1,7 @@
 """MONAI service for brain CT abnormality detection."""
 
 import logging
+from datetime import datetime
 from typing import Dict, Any, List, Optional, Union
 
 import numpy as np
@@ -116,7 +117,19 @@ class MonaiService(IDiagnosisProvider):
                 strides=(2, 2, 2, 2),
                 num_res_units=2,
             )
-            model.load_state_dict(torch.load(model_path, map_location=self.device))
+            # Memory-map the checkpoint and adopt its tensors as the parameters,
+            # so CPU workers share the weights through the page cache instead
+            # of each holding a private copy
+            try:
+                state_dict = torch.load(model_path, map_location=self.device, mmap=True)
+                model.load_state_dict(state_dict, assign=True)
+            except RuntimeError as e:
+                # Legacy (non-zipfile) checkpoints can't be memory-mapped
+                if "mmap" not in str(e):
+                    raise
+                logger.info("Checkpoint %s is not mmap-able; loading it into memory", model_path)
+                state_dict = torch.load(model_path, map_location=self.device)
+                model.load_state_dict(state_dict)
             model.to(self.device)
             model.eval()
             self.model = model
@@ -245,7 +258,6 @@ class MonaiService(IDiagnosisProvider):
         Returns:
             Mock DiagnosisResult
         """
-        from datetime import datetime
         return DiagnosisResult(
             abnormalities=["normal"],  # Default to normal for PoC
             confidence_scores={
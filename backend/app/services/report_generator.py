@@ -1,9 +1,10 @@
 """Report generator service that orchestrates the end-to-end workflow."""
 
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, Any, List, Tuple
-from collections import defaultdict
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 from backend.app.models.domain import ClinicalReport, DiagnosisResult
 from backend.app.services.dicom_parser import DicomParserService
@@ -11,6 +12,8 @@ from backend.app.services.interfaces import IDiagnosisProvider, IKheopsClient, I
 from backend.app.services.kheops_service import KheopsService
 from backend.app.services.llm_service import LLMService
 from backend.app.services.monai_service import MonaiService
+from backend.app.utils.cache import TTLCache
+from backend.app.utils.dicom_utils import DicomSource, content_digest, dicom_source_size
 from backend.app.utils.exceptions import ReportGenerationError
 from backend.app.config import get_settings
 
@@ -41,6 +44,9 @@ class ReportGenerator:
         self.diagnosis_provider = diagnosis_provider or MonaiService()
         self.report_generator = report_generator or LLMService()
         self.settings = get_settings()
+        # Preprocessed tensors keyed by file content, so re-uploaded or
+        # re-queried slices skip parsing, decoding and preprocessing
+        self._preprocess_cache = TTLCache(maxsize=self.settings.preprocess_cache_size)
 
     def generate_report_from_album(self, album_token: str, study_id: str, series_id: str = None) -> Dict[str, Any]:
         """
@@ -88,12 +94,12 @@ class ReportGenerator:
         except Exception as e:
             raise ReportGenerationError(f"Failed to generate report from album: {str(e)}") from e
 
-    def generate_report_from_dicom(self, dicom_bytes: bytes) -> Dict[str, Any]:
+    def generate_report_from_dicom(self, dicom_bytes: DicomSource) -> Dict[str, Any]:
         """
         Generate report from DICOM file bytes.
 
         Args:
-            dicom_bytes: Raw DICOM file bytes
+            dicom_bytes: Raw DICOM file bytes, a seekable binary file object or a file path
 
         Returns:
             Dictionary with report and metadata
@@ -106,7 +112,12 @@ class ReportGenerator:
         except Exception as e:
             raise ReportGenerationError(f"Failed to generate report from DICOM: {str(e)}") from e
 
-    def generate_report_from_dicom_series(self, dicom_files: List[bytes]) -> Dict[str, Any]:
+    def generate_report_from_dicom_series(
+        self,
+        dicom_files: List[DicomSource],
+        max_workers: Optional[int] = None,
+        digests: Optional[List[bytes]] = None,
+    ) -> Dict[str, Any]:
         """
         Generate aggregated report from multiple DICOM files (series) using parallel processing.
         
@@ -115,8 +126,15 @@ class ReportGenerator:
         2. Aggregate all diagnoses into a single comprehensive diagnosis
         3. Generate ONE final report from aggregated diagnosis (fast, simple for PoC)
 
+        File-like sources are only read inside the worker that parses them, so
+        at most ``max_workers`` files are held in memory at any one time.
+
         Args:
-            dicom_files: List of raw DICOM file bytes
+            dicom_files: List of raw DICOM file bytes or readable binary file objects
+            max_workers: Number of parsing threads (defaults to settings.max_workers)
+            digests: Per-file content digests already computed by the caller
+                (see dicom_utils.content_digests), reused as preprocessing
+                cache keys instead of hashing the files again
 
         Returns:
             Dictionary with aggregated report and metadata
@@ -128,15 +146,15 @@ class ReportGenerator:
             raise ReportGenerationError("No DICOM files provided")
 
         try:
-            logger.info(f"Processing {len(dicom_files)} DICOM files in parallel (PoC mode)")
+            logger.info("Processing %d DICOM files in parallel (PoC mode)", len(dicom_files))
             
             # Step 1: Process all DICOM files in parallel (fast!)
-            diagnoses, all_metadata = self._process_files_parallel(dicom_files)
+            diagnoses, all_metadata = self._process_files_parallel(dicom_files, max_workers, digests)
             
             if not diagnoses:
                 raise ReportGenerationError("Failed to process any DICOM files")
 
-            logger.info(f"Successfully processed {len(diagnoses)}/{len(dicom_files)} files")
+            logger.info("Successfully processed %d/%d files", len(diagnoses), len(dicom_files))
 
             # Step 2: Aggregate all diagnoses into one comprehensive diagnosis
             logger.info("Aggregating all diagnoses...")
@@ -165,68 +183,77 @@ class ReportGenerator:
                 "image_metadata": all_metadata,
             }
             
-            logger.info(f"✅ Successfully generated report from {len(dicom_files)} files")
+            logger.info("✅ Successfully generated report from %d files", len(dicom_files))
             return result
         except Exception as e:
-            logger.exception(f"Error generating report from DICOM series: {str(e)}")
+            logger.exception("Error generating report from DICOM series: %s", e)
             raise ReportGenerationError(f"Failed to generate report from DICOM series: {str(e)}") from e
     
-    def _parse_and_preprocess_file(self, dicom_bytes: bytes, file_index: int, total_files: int) -> Tuple[Any, Dict[str, Any], Exception]:
+    def _parse_and_preprocess_file(
+        self, dicom_source: DicomSource, file_index: int, total_files: int, digest: Optional[bytes] = None
+    ) -> Tuple[Any, Dict[str, Any], Exception]:
         """
         Parse DICOM file and preprocess image (without running inference).
         
         Includes hard sanity checks to pinpoint failures.
         
         Args:
-            dicom_bytes: Raw DICOM file bytes
+            dicom_source: Raw DICOM bytes, a seekable binary file object or a file path
             file_index: Index of the file in the series (0-based)
             total_files: Total number of files being processed
+            digest: Content digest of the source if already known
             
         Returns:
             Tuple of (preprocessed_tensor, metadata dict, Exception if any)
         """
-        from io import BytesIO
-        import pydicom
-        
         try:
+            # File-backed sources are hashed and parsed in place rather than
+            # being read into memory first
+            file_size = dicom_source_size(dicom_source)
+
             # Sanity check 1: Empty bytes
-            if not dicom_bytes:
+            if not file_size:
                 raise ValueError("Empty/None DICOM bytes received")
             
-            if len(dicom_bytes) < 132:
-                raise ValueError(f"DICOM file too small ({len(dicom_bytes)} bytes), likely corrupted")
+            if file_size < 132:
+                raise ValueError(f"DICOM file too small ({file_size} bytes), likely corrupted")
+
+            # Hashing reads the whole file, so it is skipped when the cache is disabled
+            cache_key = None
+            if self._preprocess_cache.maxsize > 0:
+                cache_key = digest if digest is not None else content_digest(dicom_source)
+                cached = self._preprocess_cache.get(cache_key)
+                if cached is not None:
+                    image_tensor, metadata = cached
+                    logger.debug("File %d/%d served from preprocessing cache", file_index + 1, total_files)
+                    return image_tensor, {**metadata, "image_index": file_index + 1}, None
             
-            # Sanity check 2: Read DICOM header
-            try:
-                dicom_file = pydicom.dcmread(BytesIO(dicom_bytes), force=True)
-            except Exception as read_error:
-                raise ValueError(f"Failed to read DICOM header: {str(read_error)}") from read_error
+            # Sanity check 2: Parse DICOM header (pixel data is left unread);
+            # the parsed dataset is reused for logging and pixel extraction
+            dicom_data = self.dicom_parser.parse_dicom_file(dicom_source)
             
             # Log DICOM metadata for debugging
-            sop_uid = getattr(dicom_file, "SOPInstanceUID", None)
+            dicom_file = dicom_data.metadata.get("_dataset")
             transfer_syntax = None
-            if hasattr(dicom_file, "file_meta") and dicom_file.file_meta:
-                transfer_syntax = getattr(dicom_file.file_meta, "TransferSyntaxUID", None)
-            has_pixel = hasattr(dicom_file, "PixelData")
+            has_pixel = None
+            if dicom_file is not None:
+                if hasattr(dicom_file, "file_meta") and dicom_file.file_meta:
+                    transfer_syntax = getattr(dicom_file.file_meta, "TransferSyntaxUID", None)
+                has_pixel = "PixelData" in dicom_file
             
             logger.info(
-                f"DICOM file {file_index + 1}/{total_files}: "
-                f"SOP={sop_uid[:20] if sop_uid else 'None'}... "
-                f"TS={transfer_syntax} "
-                f"hasPixel={has_pixel} "
-                f"size={len(dicom_bytes)} bytes"
+                "DICOM file %d/%d: SOP=%.20s... TS=%s hasPixel=%s size=%d bytes",
+                file_index + 1, total_files, dicom_data.instance_id, transfer_syntax, has_pixel, file_size,
             )
             
-            # Parse using our parser (handles metadata extraction)
-            dicom_data = self.dicom_parser.parse_dicom_file(dicom_bytes)
-            
             # Sanity check 3: Extract pixel array (this is where compression errors occur)
             try:
                 pixel_array = self.dicom_parser.extract_pixel_array(dicom_data)
             except Exception as pixel_error:
                 # This is the key decoder test - if it fails here, we know it's a pixel decoding issue
                 logger.error(
-                    f"File {file_index + 1}/{total_files} pixel extraction failed: {type(pixel_error).__name__}: {str(pixel_error)}"
+                    "File %d/%d pixel extraction failed: %s: %s",
+                    file_index + 1, total_files, type(pixel_error).__name__, pixel_error,
                 )
                 raise
             
@@ -246,92 +273,123 @@ class ReportGenerator:
                 "image_index": file_index + 1,
             }
             
-            logger.debug(f"File {file_index + 1}/{total_files} processed successfully")
+            if image_tensor is not None and cache_key is not None:
+                self._preprocess_cache.set(cache_key, (image_tensor, metadata))
+
+            logger.debug("File %d/%d processed successfully", file_index + 1, total_files)
             return image_tensor, metadata, None
             
         except Exception as e:
-            import traceback
-            error_type = type(e).__name__
-            error_msg = str(e)
-            tb_lines = traceback.format_exc().splitlines()
-            
-            logger.error(f"File {file_index + 1}/{total_files} failed: {error_type}: {error_msg}")
-            logger.error(f"Traceback:\n{traceback.format_exc()}")
+            # Traceback is formatted by the logging handler, only if emitted
+            logger.error(
+                "File %d/%d failed: %s: %s", file_index + 1, total_files, type(e).__name__, e, exc_info=True
+            )
             
             return None, None, e
     
-    def _process_files_parallel(self, dicom_files: List[bytes]) -> Tuple[List[DiagnosisResult], List[Dict[str, Any]]]:
+    def _iter_preprocessed(
+        self,
+        executor: ThreadPoolExecutor,
+        dicom_files: List[DicomSource],
+        window: int,
+        digests: Optional[List[bytes]] = None,
+    ) -> Iterator[Tuple[Any, Dict[str, Any], Exception]]:
+        """
+        Parse and preprocess files on an executor, yielding results in file order.
+
+        Unlike executor.map, at most ``window`` files are submitted ahead of
+        the consumer, so finished tensors wait in memory only for a bounded
+        number of files.
+
+        Args:
+            executor: Executor running the parsing workers
+            dicom_files: DICOM sources to process
+            window: Maximum number of files submitted but not yet consumed
+            digests: Per-file content digests, if already known
+
+        Yields:
+            _parse_and_preprocess_file result tuples
+        """
+        total_files = len(dicom_files)
+        pending = deque()
+        for idx, dicom_source in enumerate(dicom_files):
+            if len(pending) >= window:
+                yield pending.popleft().result()
+            digest = digests[idx] if digests is not None else None
+            pending.append(
+                executor.submit(self._parse_and_preprocess_file, dicom_source, idx, total_files, digest)
+            )
+        while pending:
+            yield pending.popleft().result()
+
+    def _process_files_parallel(
+        self,
+        dicom_files: List[DicomSource],
+        max_workers: Optional[int] = None,
+        digests: Optional[List[bytes]] = None,
+    ) -> Tuple[List[DiagnosisResult], List[Dict[str, Any]]]:
         """
         Process multiple DICOM files in parallel using ThreadPoolExecutor with batch inference.
         
         This method:
         1. Parses and preprocesses files in parallel (I/O bound)
-        2. Groups preprocessed images into batches
-        3. Runs batch inference (much faster than individual calls, especially on MPS/CUDA)
+        2. Groups preprocessed images into batches as soon as they are ready, in file order
+        3. Runs batch inference on each full batch while the workers keep parsing the rest
         
         Args:
-            dicom_files: List of raw DICOM file bytes
+            dicom_files: List of raw DICOM file bytes or readable binary file objects
+            max_workers: Number of parsing threads (defaults to settings.max_workers)
+            digests: Per-file content digests, if already known
             
         Returns:
             Tuple of (list of diagnoses, list of metadata dicts)
         """
-        max_workers = self.settings.max_workers
+        max_workers = max_workers or self.settings.max_workers
         batch_size = self.settings.monai_batch_size
+        total_files = len(dicom_files)
         
-        logger.info(f"Processing {len(dicom_files)} files: parsing in parallel ({max_workers} workers), inference in batches ({batch_size} per batch)")
+        logger.info(
+            "Processing %d files: parsing in parallel (%d workers), inference in batches (%d per batch)",
+            total_files, max_workers, batch_size,
+        )
         
-        # Step 1: Parse and preprocess all files in parallel (I/O bound)
-        preprocessed_data = []
+        diagnoses = []
         all_metadata = []
+        batch_tensors = []
+        batch_count = 0
         
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_index = {
-                executor.submit(self._parse_and_preprocess_file, dicom_bytes, idx, len(dicom_files)): idx
-                for idx, dicom_bytes in enumerate(dicom_files)
-            }
-            
-            # Collect results as they complete
-            results = [None] * len(dicom_files)
-            for future in as_completed(future_to_index):
-                idx = future_to_index[future]
-                try:
-                    image_tensor, metadata, error = future.result()
-                    if error is None and image_tensor is not None:
-                        results[idx] = (image_tensor, metadata)
-                        logger.debug(f"File {idx + 1}/{len(dicom_files)} parsed and preprocessed")
-                    else:
-                        logger.warning(f"File {idx + 1}/{len(dicom_files)} failed: {error}")
-                except Exception as e:
-                    logger.warning(f"File {idx + 1}/{len(dicom_files)} raised exception: {str(e)}")
-            
-            # Reconstruct ordered results
-            for result in results:
-                if result is not None:
-                    image_tensor, metadata = result
-                    preprocessed_data.append(image_tensor)
-                    all_metadata.append(metadata)
+            # Results arrive in file order, so inference on one batch overlaps
+            # with parsing of the next; the window keeps parsed tensors from
+            # piling up when inference is slower than parsing
+            results = self._iter_preprocessed(
+                executor, dicom_files, window=max_workers + batch_size, digests=digests
+            )
+            for idx, (image_tensor, metadata, error) in enumerate(results):
+                if error is not None or image_tensor is None:
+                    logger.warning("File %d/%d failed: %s", idx + 1, total_files, error)
+                    continue
+                
+                logger.debug("File %d/%d parsed and preprocessed", idx + 1, total_files)
+                batch_tensors.append(image_tensor)
+                all_metadata.append(metadata)
+                
+                if len(batch_tensors) == batch_size:
+                    batch_count += 1
+                    logger.debug("Running batch inference: batch %d (%d images)", batch_count, len(batch_tensors))
+                    diagnoses.extend(self.diagnosis_provider.run_inference_batch(batch_tensors))
+                    batch_tensors = []
         
-        if not preprocessed_data:
+        if batch_tensors:
+            batch_count += 1
+            logger.debug("Running batch inference: batch %d (%d images)", batch_count, len(batch_tensors))
+            diagnoses.extend(self.diagnosis_provider.run_inference_batch(batch_tensors))
+        
+        if not diagnoses:
             logger.warning("No files successfully preprocessed")
             return [], []
         
-        logger.info(f"Successfully preprocessed {len(preprocessed_data)}/{len(dicom_files)} files")
-        
-        # Step 2: Run batch inference (much faster than individual calls)
-        diagnoses = []
-        total_batches = (len(preprocessed_data) + batch_size - 1) // batch_size
-        
-        for batch_idx in range(0, len(preprocessed_data), batch_size):
-            batch_end = min(batch_idx + batch_size, len(preprocessed_data))
-            batch_tensors = preprocessed_data[batch_idx:batch_end]
-            
-            logger.debug(f"Running batch inference: batch {batch_idx // batch_size + 1}/{total_batches} ({len(batch_tensors)} images)")
-            
-            # Run batch inference (much faster!)
-            batch_diagnoses = self.diagnosis_provider.run_inference_batch(batch_tensors)
-            diagnoses.extend(batch_diagnoses)
-        
-        logger.info(f"✅ Successfully processed {len(diagnoses)}/{len(dicom_files)} files with batch inference")
+        logger.info("✅ Successfully processed %d/%d files with batch inference", len(diagnoses), total_files)
         return diagnoses, all_metadata
 
     def _aggregate_diagnoses(self, diagnoses: List[DiagnosisResult]) -> DiagnosisResult:
@@ -344,9 +402,6 @@ class ReportGenerator:
         Returns:
             Aggregated DiagnosisResult
         """
-        from datetime import datetime
-        from collections import Counter
-
         # Aggregate abnormalities (union of all abnormalities)
         all_abnormalities = []
         for diagnosis in diagnoses:
@@ -388,17 +443,17 @@ class ReportGenerator:
             timestamp=datetime.now(),
         )
 
-    def _process_dicom_to_report(self, dicom_bytes: bytes) -> Dict[str, Any]:
+    def _process_dicom_to_report(self, dicom_source: DicomSource) -> Dict[str, Any]:
         """
         Process DICOM bytes through the full pipeline.
 
         Args:
-            dicom_bytes: Raw DICOM file bytes
+            dicom_source: Raw DICOM bytes, a seekable binary file object or a file path
 
         Returns:
             Dictionary with report and metadata
         """
-        dicom_data = self.dicom_parser.parse_dicom_file(dicom_bytes)
+        dicom_data = self.dicom_parser.parse_dicom_file(dicom_source)
         pixel_array = self.dicom_parser.extract_pixel_array(dicom_data)
         normalized_image = self.dicom_parser.normalize_image(pixel_array)
 
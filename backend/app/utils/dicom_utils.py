@@ -1,7 +1,66 @@
 """Utility functions for DICOM file handling."""
 
+import hashlib
+import io
 from pathlib import Path
-from typing import List
+from typing import Any, BinaryIO, List, Union
+
+# Optional: xxh3 hashes at memory bandwidth; BLAKE2b is the fallback
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    xxhash = None
+    XXHASH_AVAILABLE = False
+
+# A DICOM payload is either already in memory, still sitting in a (spooled)
+# file such as Starlette's UploadFile.file, or a file on disk (e.g. a member
+# extracted from an uploaded ZIP archive).
+DicomSource = Union[bytes, BinaryIO, Path]
+
+# Elements larger than this (in practice PixelData) are left unread by
+# metadata-only dcmread calls instead of being copied out of the buffer
+METADATA_DEFER_SIZE = 1024
+
+# Part-10 DICOM signature, found at offset 128 after the preamble
+_DICM_MAGIC = b"DICM"
+
+# Read size used when hashing file-backed sources
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def _new_content_hasher() -> Any:
+    """Create a streaming 128-bit content hasher (xxh3 if available, else BLAKE2b)."""
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+
+def content_digest(source: DicomSource) -> bytes:
+    """
+    Compute a cache key for a single DICOM payload.
+
+    File-backed sources are streamed in chunks, so they are never fully
+    loaded into memory.
+
+    Args:
+        source: Raw DICOM bytes, a readable binary file object or a file path
+
+    Returns:
+        16-byte digest of the content
+    """
+    hasher = _new_content_hasher()
+    if isinstance(source, bytes):
+        hasher.update(source)
+    elif isinstance(source, Path):
+        with source.open("rb") as fh:
+            for chunk in iter(lambda: fh.read(_HASH_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+    else:
+        source.seek(0)
+        for chunk in iter(lambda: source.read(_HASH_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.digest()
 
 
 def collect_all_files_recursively(root: Path) -> List[Path]:
@@ -33,5 +92,76 @@ def looks_like_dicom(b: bytes) -> bool:
     if b is None or len(b) < 132:
         return False
     
-    # Check for DICM signature at offset 128 (Part-10 DICOM)
-    return b[128:132] == b"DICM" or b[:4] == b"DICM"
+    # Check for DICM signature at offset 128 (Part-10 DICOM); startswith with
+    # an offset compares in place instead of slicing out a new bytes object
+    return b.startswith(_DICM_MAGIC, 128) or b.startswith(_DICM_MAGIC)
+
+
+def dicom_source_size(source: DicomSource) -> int:
+    """
+    Get the size of a DICOM source without reading its contents.
+
+    Args:
+        source: Raw DICOM bytes, a seekable binary file object or a file path
+
+    Returns:
+        Size in bytes
+    """
+    if isinstance(source, bytes):
+        return len(source)
+
+    if isinstance(source, Path):
+        return source.stat().st_size
+
+    size = source.seek(0, io.SEEK_END)
+    source.seek(0)
+    return size
+
+
+def content_digests(sources: List[DicomSource]) -> List[bytes]:
+    """
+    Compute the content_digest of each DICOM source, in order.
+
+    Args:
+        sources: Raw DICOM bytes, readable binary file objects or file paths
+
+    Returns:
+        One 16-byte digest per source
+    """
+    return [content_digest(source) for source in sources]
+
+
+def combine_content_digests(digests: List[bytes]) -> str:
+    """
+    Combine per-file digests, in order, into a key for the whole upload.
+
+    Slice order affects the generated report, so the same files in a
+    different order give a different key.
+
+    Args:
+        digests: Per-file digests as returned by content_digests
+
+    Returns:
+        Hex digest identifying the uploaded content
+    """
+    combined = hashlib.blake2b(digest_size=32)
+    for digest in digests:
+        combined.update(digest)
+    return combined.hexdigest()
+
+
+def hash_dicom_sources(sources: List[DicomSource]) -> str:
+    """
+    Compute a content key for an ordered list of DICOM sources.
+
+    Each payload is hashed with xxh3 (or BLAKE2b when xxhash isn't
+    installed), streaming file-backed sources in chunks so they are never
+    fully loaded, and the per-file digests are combined in order.
+
+    Args:
+        sources: Raw DICOM bytes, readable binary file objects or file paths
+
+    Returns:
+        Hex digest identifying the uploaded content
+    """
+    return combine_content_digests(content_digests(sources))
@@ -1,13 +1,18 @@
 """Integration tests for API routes."""
 
+import io
+import zipfile
 from unittest.mock import Mock, patch
 
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 
+from backend.app.api.routes import _extract_zip_upload
 from backend.app.main import app
 from backend.app.models.domain import ClinicalReport, DiagnosisResult, Series, Study
 from backend.app.models.schemas import ReportResponse
+from backend.app.utils.dicom_utils import hash_dicom_sources
 
 
 class TestHealthEndpoint:
@@ -124,3 +129,58 @@ class TestInferenceEndpoints:
         assert response.status_code == 200
         assert "report" in response.json()
         assert "diagnosis" in response.json()
+
+    def test_generate_report_from_dicom_rejects_non_dicom(self):
+        """Test that uploads without a DICM signature are rejected up front."""
+        # Arrange: Create test client
+        client = TestClient(app)
+
+        # Act: Upload a file that is not DICOM
+        response = client.post(
+            "/api/inference/from-dicom",
+            files={"dicom_files": ("notes.txt", b"not a dicom file" * 20, "text/plain")},
+        )
+
+        # Assert: Verify unsupported media type
+        assert response.status_code == 415
+
+    def test_generate_report_from_dicom_revalidates_etag(self):
+        """Test that a matching If-None-Match is answered with 304 before inference."""
+        # Arrange: DICM-signed upload and the ETag of its content
+        content = b"\x00" * 128 + b"DICM" + b"\x00" * 64
+        etag = f'"{hash_dicom_sources([content])}"'
+        client = TestClient(app)
+
+        # Act: Revalidate the upload with its ETag
+        response = client.post(
+            "/api/inference/from-dicom",
+            files={"dicom_files": ("scan.dcm", content, "application/dicom")},
+            headers={"If-None-Match": etag},
+        )
+
+        # Assert: Verify not modified with the same ETag
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+
+    def test_extract_zip_upload_counts_only_dicom_members(self, tmp_path):
+        """Test that non-DICOM ZIP members don't count against the file limit."""
+        # Arrange: Archive with two DICOM members and a README
+        dicom_content = b"\x00" * 128 + b"DICM" + b"\x00" * 64
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("README.txt", b"exported by KHEOPS")
+            zf.writestr("DICOM/0/a.dcm", dicom_content)
+            zf.writestr("DICOM/0/b.dcm", dicom_content)
+        archive.seek(0)
+        upload = Mock(file=archive, filename="series.zip")
+
+        # Act: Extract with room for exactly two files, then for one
+        paths = _extract_zip_upload(upload, tmp_path, max_files=2)
+        archive.seek(0)
+        with pytest.raises(HTTPException) as exc_info:
+            _extract_zip_upload(upload, tmp_path, max_files=1)
+
+        # Assert: The README is skipped, and the limit actually applied is reported
+        assert len(paths) == 2
+        assert exc_info.value.status_code == 413
+        assert "Only 1 more" in exc_info.value.detail
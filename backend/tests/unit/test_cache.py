@@ -0,0 +1,65 @@
+"""Unit tests for in-process caches."""
+
+from unittest.mock import patch
+
+from backend.app.utils.cache import TTLCache
+
+
+class TestTTLCache:
+    """Test TTLCache class."""
+
+    def test_get_returns_stored_value(self):
+        """Test that stored values are returned."""
+        # Arrange: Create cache with one entry
+        cache = TTLCache(maxsize=2)
+        cache.set("key", b"value")
+
+        # Act: Look up entry
+        result = cache.get("key")
+
+        # Assert: Verify value is returned
+        assert result == b"value"
+        assert cache.get("missing") is None
+
+    def test_evicts_least_recently_used(self):
+        """Test that the least recently used entry is evicted when full."""
+        # Arrange: Fill cache and touch the oldest entry
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+
+        # Act: Insert a third entry
+        cache.set("c", 3)
+
+        # Assert: Verify "b" was evicted
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+
+    def test_expired_entries_are_dropped(self):
+        """Test that entries expire after their ttl."""
+        # Arrange: Store entry at t=100
+        cache = TTLCache(maxsize=2, ttl=10)
+        with patch("backend.app.utils.cache.time.monotonic", return_value=100.0):
+            cache.set("key", "value")
+
+        # Act: Look up entry after ttl has passed
+        with patch("backend.app.utils.cache.time.monotonic", return_value=111.0):
+            result = cache.get("key")
+
+        # Assert: Verify entry expired
+        assert result is None
+        assert len(cache) == 0
+
+    def test_zero_maxsize_disables_cache(self):
+        """Test that maxsize=0 never stores entries."""
+        # Arrange: Create disabled cache
+        cache = TTLCache(maxsize=0)
+
+        # Act: Store entry
+        cache.set("key", "value")
+
+        # Assert: Verify nothing is cached
+        assert cache.get("key") is None
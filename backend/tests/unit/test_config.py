@@ -66,6 +66,19 @@ def test_get_settings_returns_settings_instance():
     assert isinstance(settings, Settings)
 
 
+def test_get_settings_is_cached():
+    """Test that get_settings reuses a single Settings instance."""
+    # Arrange: Start from an empty cache
+    get_settings.cache_clear()
+
+    # Act: Call get_settings twice
+    first = get_settings()
+    second = get_settings()
+
+    # Assert: Verify the same instance is returned
+    assert first is second
+
+
 def test_settings_api_reload_default():
     """Test that API reload defaults to True."""
     # Arrange: No API_RELOAD set
@@ -74,3 +87,24 @@ def test_settings_api_reload_default():
 
     # Assert: Verify default reload value
     assert settings.api_reload is True
+
+
+def test_settings_upload_limits_default():
+    """Test that per-file and per-upload limits have sane defaults."""
+    # Arrange: No MAX_DICOM_FILE_MB or MAX_SERIES_FILES set
+    # Act: Create settings instance
+    settings = Settings()
+
+    # Assert: Verify default upload limits
+    assert settings.max_dicom_file_mb == 100
+    assert settings.max_series_files == 2000
+
+
+def test_settings_max_concurrent_inferences_default():
+    """Test that concurrent report generation is capped by default."""
+    # Arrange: No MAX_CONCURRENT_INFERENCES set
+    # Act: Create settings instance
+    settings = Settings()
+
+    # Assert: Verify default cap
+    assert settings.max_concurrent_inferences == 2
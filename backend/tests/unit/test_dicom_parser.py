@@ -1,10 +1,12 @@
 """Unit tests for DICOM parser service."""
 
 from io import BytesIO
+from pathlib import Path
 
 import numpy as np
 import pydicom
 import pytest
+from pydicom.data import get_testdata_file
 
 from backend.app.models.domain import DicomData
 from backend.app.services.dicom_parser import DicomParserService
@@ -45,6 +47,37 @@ class TestDicomParserService:
         assert dicom_data.series_id == "1.2.3.4.5.6"
         assert dicom_data.patient_id == "PATIENT001"
         assert dicom_data.metadata["modality"] == "CT"
+        assert dicom_data.metadata["_dataset"].SOPInstanceUID == "1.2.3.4.5.6.7"
+
+    def test_parse_dicom_file_from_path(self):
+        """Test parsing and pixel extraction from a file on disk."""
+        # Arrange: Path to an uncompressed CT slice
+        dicom_path = Path(get_testdata_file("CT_small.dcm"))
+        parser = DicomParserService()
+
+        # Act: Parse and extract pixels without loading the file first
+        dicom_data = parser.parse_dicom_file(dicom_path)
+        pixel_array = parser.extract_pixel_array(dicom_data)
+
+        # Assert: Verify metadata and pixels
+        assert dicom_data.metadata["modality"] == "CT"
+        assert pixel_array.shape == (128, 128)
+
+    def test_parse_dicom_file_from_file_object(self):
+        """Test parsing and pixel extraction from a file object."""
+        # Arrange: Spooled-upload style file object, not at position 0
+        with open(get_testdata_file("CT_small.dcm"), "rb") as fh:
+            upload = BytesIO(fh.read())
+        upload.seek(10)
+        parser = DicomParserService()
+
+        # Act: Parse and extract pixels
+        dicom_data = parser.parse_dicom_file(upload)
+        pixel_array = parser.extract_pixel_array(dicom_data)
+
+        # Assert: Verify metadata and pixels
+        assert dicom_data.metadata["modality"] == "CT"
+        assert pixel_array.shape == (128, 128)
 
     def test_parse_dicom_file_invalid_bytes(self):
         """Test parsing with invalid DICOM bytes."""
@@ -56,6 +89,16 @@ class TestDicomParserService:
         with pytest.raises(DicomParseError):
             parser.parse_dicom_file(invalid_bytes)
 
+    def test_parse_dicom_file_html_payload(self):
+        """Test parsing rejects an HTML error page."""
+        # Arrange: HTML response body with leading whitespace
+        html_bytes = b"\n  <!DOCTYPE html><html><body>502 Bad Gateway</body></html>"
+        parser = DicomParserService()
+
+        # Act & Assert: Verify DicomParseError is raised before dcmread
+        with pytest.raises(DicomParseError, match="HTML/XML"):
+            parser.parse_dicom_file(html_bytes)
+
     def test_extract_pixel_array_success(self):
         """Test successful pixel array extraction."""
         # Arrange: Create DICOM with pixel data
@@ -71,11 +114,7 @@ class TestDicomParserService:
         dicom_file.is_little_endian = True
         dicom_file.is_implicit_VR = False
 
-        buffer = BytesIO()
-        pydicom.dcmwrite(buffer, dicom_file)
-        dicom_bytes = buffer.getvalue()
-
-        dicom_data = DicomData(metadata={"raw_bytes": dicom_bytes})
+        dicom_data = DicomData(metadata={"_dataset": dicom_file})
         parser = DicomParserService()
 
         # Act: Extract pixel array
@@ -83,12 +122,44 @@ class TestDicomParserService:
 
         # Assert: Verify pixel array
         assert isinstance(pixel_array, np.ndarray)
-        assert pixel_array.dtype == np.float32
+        assert pixel_array.dtype == np.uint16
         assert pixel_array.shape == (256, 256)
 
-    def test_extract_pixel_array_no_raw_bytes(self):
-        """Test extraction when raw bytes are missing."""
-        # Arrange: DicomData without raw_bytes
+    def test_extract_pixel_array_compressed(self):
+        """Test pixel extraction from JPEG 2000 compressed DICOM."""
+        # Arrange: Parse a compressed DICOM file from pydicom's test data
+        with open(get_testdata_file("JPEG2000.dcm"), "rb") as fh:
+            dicom_bytes = fh.read()
+        parser = DicomParserService()
+        dicom_data = parser.parse_dicom_file(dicom_bytes)
+
+        # Act: Extract pixel array
+        pixel_array = parser.extract_pixel_array(dicom_data)
+
+        # Assert: Verify decoded image dimensions
+        assert pixel_array.shape == (1024, 256)
+
+    def test_extract_pixel_array_native_matches_pydicom(self):
+        """Test that uncompressed pixels match pydicom's own decoding."""
+        # Arrange: Parse an uncompressed little-endian CT slice
+        dicom_path = get_testdata_file("CT_small.dcm")
+        with open(dicom_path, "rb") as fh:
+            dicom_bytes = fh.read()
+        parser = DicomParserService()
+        dicom_data = parser.parse_dicom_file(dicom_bytes)
+
+        # Act: Extract pixel array
+        pixel_array = parser.extract_pixel_array(dicom_data)
+
+        # Assert: Verify identical values and dtype, served as a read-only view
+        expected = pydicom.dcmread(dicom_path).pixel_array
+        assert pixel_array.dtype == expected.dtype
+        np.testing.assert_array_equal(pixel_array, expected)
+        assert not pixel_array.flags.writeable
+
+    def test_extract_pixel_array_no_dataset(self):
+        """Test extraction when the parsed dataset is missing."""
+        # Arrange: DicomData without a parsed dataset
         dicom_data = DicomData(metadata={})
         parser = DicomParserService()
 
@@ -111,6 +182,20 @@ class TestDicomParserService:
         assert np.min(normalized) >= 0.0
         assert np.max(normalized) <= 1.0
 
+    def test_normalize_image_leaves_input_unchanged(self):
+        """Test that normalization does not modify the input array."""
+        # Arrange: Create float32 image
+        image = np.array([[10.0, 20.0, 30.0]], dtype=np.float32)
+        original = image.copy()
+        parser = DicomParserService()
+
+        # Act: Normalize image
+        normalized = parser.normalize_image(image)
+
+        # Assert: Verify input is untouched and output is rescaled
+        np.testing.assert_array_equal(image, original)
+        np.testing.assert_allclose(normalized, [[0.0, 0.5, 1.0]])
+
     def test_normalize_image_empty(self):
         """Test normalization with empty image."""
         # Arrange: Empty image
@@ -1,7 +1,9 @@
 """Unit tests for Kheops service."""
 
-from unittest.mock import Mock, patch
+import asyncio
+from unittest.mock import MagicMock, Mock, patch
 
+import orjson
 import pytest
 import requests
 
@@ -36,6 +38,18 @@ class TestKheopsService:
         assert service.settings == custom_settings
         assert service.base_url == "https://custom.kheops.online"
 
+    def test_close_closes_session(self):
+        """Test that close releases the pooled session."""
+        # Arrange: Create service with its session spied on
+        service = KheopsService()
+
+        # Act: Close the service
+        with patch.object(service._session, "close") as mock_close:
+            service.close()
+
+        # Assert: Verify the session was closed
+        mock_close.assert_called_once()
+
     def test_get_headers_includes_authorization(self):
         """Test that headers include authorization token."""
         # Arrange: Create service and token
@@ -49,12 +63,23 @@ class TestKheopsService:
         assert "Authorization" in headers
         assert headers["Authorization"] == f"Bearer {token}"
 
-    @patch("backend.app.services.kheops_service.requests.request")
+    def test_get_headers_requests_compressed_responses(self):
+        """Test that headers advertise gzip response compression."""
+        # Arrange: Create service
+        service = KheopsService()
+
+        # Act: Get headers
+        headers = service._get_headers("test_token")
+
+        # Assert: Verify gzip is accepted
+        assert "gzip" in headers["Accept-Encoding"]
+
+    @patch("backend.app.services.kheops_service.requests.Session.request")
     def test_fetch_studies_success(self, mock_request):
         """Test successful fetch_studies call."""
         # Arrange: Mock successful response
         mock_response = Mock()
-        mock_response.json.return_value = [
+        mock_response.content = orjson.dumps([
             {
                 "0020000D": {"Value": ["study1"]},
                 "00080020": {"Value": ["20240101"]},
@@ -62,7 +87,7 @@ class TestKheopsService:
                 "00100020": {"Value": ["patient1"]},
                 "00100010": {"Value": ["John^Doe"]},
             }
-        ]
+        ])
         mock_response.raise_for_status = Mock()
         mock_request.return_value = mock_response
 
@@ -79,12 +104,29 @@ class TestKheopsService:
         assert studies[0].study_date == "20240101"
         assert studies[0].study_description == "Brain CT"
 
-    @patch("backend.app.services.kheops_service.requests.request")
+    @patch("backend.app.services.kheops_service.requests.Session.request")
+    def test_fetch_studies_with_pagination(self, mock_request):
+        """Test that limit/offset are sent as QIDO-RS query parameters."""
+        # Arrange: Mock empty response
+        mock_response = Mock()
+        mock_response.content = orjson.dumps([])
+        mock_response.raise_for_status = Mock()
+        mock_request.return_value = mock_response
+
+        service = KheopsService()
+
+        # Act: Fetch a page of studies
+        service.fetch_studies("test_token", limit=50, offset=100)
+
+        # Assert: Verify paging parameters were passed
+        assert mock_request.call_args.kwargs["params"] == {"limit": 50, "offset": 100}
+
+    @patch("backend.app.services.kheops_service.requests.Session.request")
     def test_fetch_studies_with_dict_patient_name(self, mock_request):
         """Test fetch_studies with patient name as dictionary."""
         # Arrange: Mock response with dict patient name
         mock_response = Mock()
-        mock_response.json.return_value = [
+        mock_response.content = orjson.dumps([
             {
                 "0020000D": {"Value": ["study1"]},
                 "00080020": {"Value": ["20240101"]},
@@ -92,7 +134,7 @@ class TestKheopsService:
                 "00100020": {"Value": ["patient1"]},
                 "00100010": {"Value": [{"Alphabetic": "SUJATHA DR.SHANKAR NAIK MS ORTHO"}]},
             }
-        ]
+        ])
         mock_response.raise_for_status = Mock()
         mock_request.return_value = mock_response
 
@@ -142,7 +184,54 @@ class TestKheopsService:
         # Assert: Verify alphabetic value returned
         assert result == "Test Patient"
 
-    @patch("backend.app.services.kheops_service.requests.request")
+    @patch("backend.app.services.kheops_service.requests.Session.request")
+    def test_fetch_series_uses_metadata_cache(self, mock_request):
+        """Test that repeated series listings are served from the cache."""
+        # Arrange: Mock successful response
+        mock_response = Mock()
+        mock_response.content = orjson.dumps([{"0020000E": {"Value": ["series1"]}}])
+        mock_response.raise_for_status = Mock()
+        mock_request.return_value = mock_response
+
+        service = KheopsService()
+
+        # Act: Fetch the same series listing twice
+        first = service.fetch_series("test_token", "study1")
+        second = service.fetch_series("test_token", "study1")
+
+        # Assert: Verify a single HTTP request and equal results
+        assert mock_request.call_count == 1
+        assert first == second
+        assert second[0].series_id == "series1"
+
+    @patch("backend.app.services.kheops_service.requests.Session.request")
+    def test_fetch_instances_batched_uses_single_request(self, mock_request):
+        """Test that batched instance listings share one study-wide request."""
+        # Arrange: Study-level instances response spanning two series
+        mock_response = Mock()
+        mock_response.content = orjson.dumps([
+            {"0020000E": {"Value": ["series1"]}, "00080018": {"Value": ["inst1"]}},
+            {"0020000E": {"Value": ["series2"]}, "00080018": {"Value": ["inst2"]},
+             "00081190": {"Value": ["http://kheops/inst2"]}},
+            {"0020000E": {"Value": ["series1"]}, "00080018": {"Value": ["inst3"]}},
+        ])
+        mock_response.raise_for_status = Mock()
+        mock_request.return_value = mock_response
+
+        service = KheopsService()
+
+        # Act: Fetch instances of both series in batched mode
+        series1 = service.fetch_instances("token", "study1", "series1", batched=True)
+        series2 = service.fetch_instances("token", "study1", "series2", batched=True)
+
+        # Assert: Verify a single study-level request grouped by series
+        assert mock_request.call_count == 1
+        assert mock_request.call_args.args[1].endswith("/studies/study1/instances")
+        assert "includefield" in mock_request.call_args.kwargs["params"]
+        assert [i["instance_id"] for i in series1] == ["inst1", "inst3"]
+        assert series2 == [{"instance_id": "inst2", "instance_url": "http://kheops/inst2"}]
+
+    @patch("backend.app.services.kheops_service.requests.Session.request")
     def test_fetch_studies_api_error(self, mock_request):
         """Test fetch_studies with API error."""
         # Arrange: Mock API error
@@ -155,19 +244,19 @@ class TestKheopsService:
         with pytest.raises(KheopsAPIError):
             service.fetch_studies(token)
 
-    @patch("backend.app.services.kheops_service.requests.request")
+    @patch("backend.app.services.kheops_service.requests.Session.request")
     def test_fetch_series_success(self, mock_request):
         """Test successful fetch_series call."""
         # Arrange: Mock successful response
         mock_response = Mock()
-        mock_response.json.return_value = [
+        mock_response.content = orjson.dumps([
             {
                 "0020000E": {"Value": ["series1"]},
                 "0008103E": {"Value": ["Axial"]},
                 "00080060": {"Value": ["CT"]},
                 "00081190": {"Value": ["instance1", "instance2"]},
             }
-        ]
+        ])
         mock_response.raise_for_status = Mock()
         mock_request.return_value = mock_response
 
@@ -185,12 +274,12 @@ class TestKheopsService:
         assert series_list[0].study_id == study_id
         assert series_list[0].modality == "CT"
 
-    @patch("backend.app.services.kheops_service.requests.request")
+    @patch("backend.app.services.kheops_service.requests.Session.request")
     def test_fetch_instances_success(self, mock_request):
         """Test successful fetch_instances call."""
         # Arrange: Mock successful response
         mock_response = Mock()
-        mock_response.json.return_value = [
+        mock_response.content = orjson.dumps([
             {
                 "00080018": {"Value": ["instance1"]},
                 "00081190": {"Value": ["https://demo.kheops.online/api/studies/study1/series/series1/instances/instance1"]}
@@ -199,7 +288,7 @@ class TestKheopsService:
                 "00080018": {"Value": ["instance2"]},
                 "00081190": {"Value": ["https://demo.kheops.online/api/studies/study1/series/series1/instances/instance2"]}
             },
-        ]
+        ])
         mock_response.raise_for_status = Mock()
         mock_request.return_value = mock_response
 
@@ -218,7 +307,7 @@ class TestKheopsService:
         assert instances[1]["instance_id"] == "instance2"
         assert instances[1]["instance_url"] == "https://demo.kheops.online/api/studies/study1/series/series1/instances/instance2"
 
-    @patch("backend.app.services.kheops_service.requests.request")
+    @patch("backend.app.services.kheops_service.requests.Session.request")
     def test_fetch_instances_api_error(self, mock_request):
         """Test fetch_instances with API error."""
         # Arrange: Mock API error
@@ -233,14 +322,14 @@ class TestKheopsService:
         with pytest.raises(KheopsAPIError):
             service.fetch_instances(token, study_id, series_id)
 
-    @patch("backend.app.services.kheops_service.requests.get")
+    @patch("backend.app.services.kheops_service.requests.Session.get")
     def test_download_instance_success(self, mock_get):
         """Test successful download_instance call."""
         # Arrange: Mock successful download
-        mock_response = Mock()
-        mock_response.content = b"DICOM_FILE_CONTENT"
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.iter_content.side_effect = lambda chunk_size: iter([b"DICOM_FILE_CONTENT"])
         mock_response.headers = {"Content-Type": "application/dicom"}
-        mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
         service = KheopsService()
@@ -256,7 +345,7 @@ class TestKheopsService:
         assert content == b"DICOM_FILE_CONTENT"
         assert mock_get.called
 
-    @patch("backend.app.services.kheops_service.requests.get")
+    @patch("backend.app.services.kheops_service.requests.Session.get")
     def test_download_instance_error(self, mock_get):
         """Test download_instance with error."""
         # Arrange: Mock download error
@@ -271,3 +360,117 @@ class TestKheopsService:
         # Act & Assert: Verify KheopsAPIError is raised
         with pytest.raises(KheopsAPIError):
             service.download_instance(token, study_id, series_id, instance_id)
+
+    def test_download_series_preserves_order(self):
+        """Test that concurrent series downloads return files in instance order."""
+        # Arrange: Service with download_instance stubbed per instance
+        service = KheopsService()
+        instances = [
+            {"instance_id": f"instance{i}", "instance_url": f"https://kheops/instances/{i}"} for i in range(5)
+        ]
+
+        # Act: Download the series with several workers
+        with patch.object(
+            service, "download_instance", side_effect=lambda *args: args[3].encode()
+        ) as mock_download:
+            contents = service.download_series("token", "study1", "series1", instances, max_workers=3)
+
+        # Assert: Verify ordering and per-instance URLs
+        assert contents == [f"instance{i}".encode() for i in range(5)]
+        mock_download.assert_any_call("token", "study1", "series1", "instance2", "https://kheops/instances/2")
+
+    def test_download_series_async_fetches_instances_and_preserves_order(self):
+        """Test that async series downloads list instances first and keep their order."""
+        # Arrange: Service with the listing and download_instance stubbed
+        service = KheopsService()
+        instances = [{"instance_id": f"instance{i}", "instance_url": None} for i in range(4)]
+
+        # Act: Download the series without passing the instance list
+        with patch.object(service, "fetch_instances", return_value=instances) as mock_fetch, patch.object(
+            service, "download_instance", side_effect=lambda *args: args[3].encode()
+        ):
+            contents = asyncio.run(
+                service.download_series_async("token", "study1", "series1", max_concurrency=2)
+            )
+
+        # Assert: Verify the listing call and ordering
+        mock_fetch.assert_called_once_with("token", "study1", "series1")
+        assert contents == [f"instance{i}".encode() for i in range(4)]
+
+    @patch("backend.app.services.kheops_service.requests.Session.get")
+    def test_download_instance_skips_json_body(self, mock_get):
+        """Test that JSON metadata responses are rejected after the first chunk."""
+        # Arrange: Streamed JSON response whose remaining chunks must not be read
+        remaining = Mock(side_effect=AssertionError("body read past first chunk"))
+
+        def json_chunks(chunk_size):
+            yield b'[{"00080018": {"Value": ["1.2.3"]}}' + b" " * 200
+            remaining()
+
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.iter_content.side_effect = json_chunks
+        mock_response.headers = {"Content-Type": "application/dicom"}
+        mock_get.return_value = mock_response
+
+        service = KheopsService()
+
+        # Act & Assert: Every URL pattern is rejected without reading further
+        with pytest.raises(KheopsAPIError):
+            service.download_instance("token", "study1", "series1", "instance1")
+        remaining.assert_not_called()
+
+    @patch("backend.app.services.kheops_service.requests.Session.get")
+    def test_download_instance_diagnoses_json_error_body(self, mock_get):
+        """Test that a JSON error body is kept for the failure diagnosis."""
+        # Arrange: Streamed 406 response with a JSON body
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError("406 Not Acceptable")
+        mock_response.iter_content.side_effect = lambda chunk_size: iter([b'{"error": "not acceptable"}'])
+        mock_get.return_value = mock_response
+
+        service = KheopsService()
+
+        # Act & Assert: The error explains that JSON came back instead of DICOM
+        with pytest.raises(KheopsAPIError, match="DIAGNOSIS"):
+            service.download_instance("token", "study1", "series1", "instance1")
+
+    @patch("backend.app.services.kheops_service.requests.Session.get")
+    def test_download_instance_skips_json_content_type(self, mock_get):
+        """Test that responses declared as JSON metadata are rejected without reading the body."""
+        # Arrange: DICOM JSON response whose body must never be read
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.headers = {"Content-Type": "application/dicom+json"}
+        mock_get.return_value = mock_response
+
+        service = KheopsService()
+
+        # Act & Assert: Every URL pattern is rejected from its headers alone
+        with pytest.raises(KheopsAPIError):
+            service.download_instance("token", "study1", "series1", "instance1")
+        mock_response.iter_content.assert_not_called()
+
+    @patch("backend.app.services.kheops_service.requests.Session.get")
+    def test_download_instance_skips_large_unsigned_body(self, mock_get):
+        """Test that large bodies without a DICM signature are rejected from their head."""
+        # Arrange: Large binary response whose head has no DICM signature
+        remaining = Mock(side_effect=AssertionError("body read past first chunk"))
+
+        def binary_chunks(chunk_size):
+            yield b"\x00" * 256
+            remaining()
+
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.iter_content.side_effect = binary_chunks
+        mock_response.headers = {"Content-Type": "application/dicom", "Content-Length": "5000000"}
+        mock_get.return_value = mock_response
+
+        service = KheopsService()
+
+        # Act & Assert: Every URL pattern is rejected without reading further
+        with pytest.raises(KheopsAPIError):
+            service.download_instance("token", "study1", "series1", "instance1")
+        remaining.assert_not_called()
@@ -8,7 +8,7 @@ import torch
 
 from backend.app.config import Settings
 from backend.app.models.domain import DiagnosisResult
-from backend.app.services.monai_service import MonaiService
+from backend.app.services.monai_service import MonaiService, UNet
 from backend.app.utils.exceptions import ModelLoadError
 
 
@@ -60,6 +60,29 @@ class TestMonaiService:
         mock_model.to.assert_called_once()
         mock_model.eval.assert_called_once()
 
+    def test_load_model_legacy_checkpoint(self, tmp_path):
+        """Test loading a checkpoint saved in the legacy (non-zipfile) format."""
+        # Arrange: Save a real UNet state dict without zipfile serialization
+        service = MonaiService(settings=Settings(monai_device="cpu"))
+        reference = UNet(
+            spatial_dims=2,
+            in_channels=1,
+            out_channels=2,
+            channels=(16, 32, 64, 128, 256),
+            strides=(2, 2, 2, 2),
+            num_res_units=2,
+        )
+        model_path = tmp_path / "legacy.pth"
+        torch.save(reference.state_dict(), model_path, _use_new_zipfile_serialization=False)
+
+        # Act: Load the legacy checkpoint
+        service.load_model(str(model_path))
+
+        # Assert: Verify the weights were loaded
+        loaded = service.model.state_dict()
+        for name, tensor in reference.state_dict().items():
+            assert torch.equal(loaded[name], tensor)
+
     @patch("backend.app.services.monai_service.torch.load")
     def test_load_model_failure(self, mock_torch_load):
         """Test model loading failure."""
@@ -1,6 +1,7 @@
 """Unit tests for report generator service."""
 
-from unittest.mock import Mock
+from io import BytesIO
+from unittest.mock import Mock, patch
 
 import pytest
 
@@ -177,3 +178,197 @@ class TestReportGenerator:
         # Act & Assert: Verify ReportGenerationError is raised
         with pytest.raises(ReportGenerationError):
             generator.generate_report_from_dicom(b"invalid_bytes")
+
+    def test_generate_report_from_dicom_file_object(self):
+        """Test that file-like sources are parsed without being read first."""
+        # Arrange: Mock parser and a spooled upload
+        mock_parser = Mock(spec=DicomParserService)
+        mock_parser.parse_dicom_file.side_effect = Exception("Parse error")
+        upload = BytesIO(b"spooled_dicom_bytes")
+        upload.seek(5)
+
+        generator = ReportGenerator(dicom_parser=mock_parser)
+
+        # Act: Generate report (parser error is expected)
+        with pytest.raises(ReportGenerationError):
+            generator.generate_report_from_dicom(upload)
+
+        # Assert: Parser received the file object itself
+        mock_parser.parse_dicom_file.assert_called_once_with(upload)
+
+    def test_generate_report_from_dicom_path(self, tmp_path):
+        """Test that path sources are parsed without being read first."""
+        # Arrange: Mock parser and a DICOM file extracted to disk
+        mock_parser = Mock(spec=DicomParserService)
+        mock_parser.parse_dicom_file.side_effect = Exception("Parse error")
+        dicom_path = tmp_path / "slice.dcm"
+        dicom_path.write_bytes(b"extracted_dicom_bytes")
+
+        generator = ReportGenerator(dicom_parser=mock_parser)
+
+        # Act: Generate report (parser error is expected)
+        with pytest.raises(ReportGenerationError):
+            generator.generate_report_from_dicom(dicom_path)
+
+        # Assert: Parser received the path itself
+        mock_parser.parse_dicom_file.assert_called_once_with(dicom_path)
+
+    def test_generate_report_from_dicom_series_batches_in_order(self):
+        """Test that series inference runs in file-ordered batches."""
+        # Arrange: Mock pipeline with a batch size of 2
+        mock_parser = Mock(spec=DicomParserService)
+        mock_monai = Mock(spec=MonaiService)
+        mock_llm = Mock(spec=LLMService)
+
+        mock_parser.parse_dicom_file.side_effect = lambda b: DicomData(study_id="study1", instance_id=b[-1:].decode())
+        mock_parser.extract_pixel_array.return_value = Mock(size=1)
+        mock_parser.normalize_image.return_value = Mock()
+        mock_monai.preprocess_image.side_effect = lambda image: Mock()
+        mock_monai.run_inference_batch.side_effect = lambda tensors: [
+            DiagnosisResult(abnormalities=["normal"], confidence_scores={"normal": 0.9}, findings={})
+            for _ in tensors
+        ]
+        mock_llm.format_report.return_value = ClinicalReport(findings="Test findings")
+
+        generator = ReportGenerator(
+            dicom_parser=mock_parser,
+            diagnosis_provider=mock_monai,
+            report_generator=mock_llm,
+        )
+        generator.settings = generator.settings.model_copy(update={"monai_batch_size": 2})
+        dicom_files = [b"\x00" * 128 + b"DICM" + str(i).encode() for i in range(3)]
+
+        # Act: Generate series report
+        result = generator.generate_report_from_dicom_series(dicom_files, max_workers=2)
+
+        # Assert: Verify two batches (2 + 1) and file-ordered metadata
+        batch_sizes = [len(call.args[0]) for call in mock_monai.run_inference_batch.call_args_list]
+        assert batch_sizes == [2, 1]
+        assert [m["instance_id"] for m in result["image_metadata"]] == ["0", "1", "2"]
+        assert result["dicom_metadata"]["total_images_processed"] == "3"
+
+    def test_generate_report_from_dicom_series_bounds_files_in_flight(self):
+        """Test that parsing runs at most a window of files ahead of inference."""
+        # Arrange: Mock pipeline recording how many files were parsed per batch
+        mock_parser = Mock(spec=DicomParserService)
+        mock_monai = Mock(spec=MonaiService)
+        mock_llm = Mock(spec=LLMService)
+
+        mock_parser.parse_dicom_file.side_effect = lambda b: DicomData(study_id="study1", instance_id=b[-1:].decode())
+        mock_parser.extract_pixel_array.return_value = Mock(size=1)
+        mock_parser.normalize_image.return_value = Mock()
+        mock_monai.preprocess_image.side_effect = lambda image: Mock()
+        parsed_at_inference = []
+
+        def run_batch(tensors):
+            parsed_at_inference.append(mock_parser.parse_dicom_file.call_count)
+            return [
+                DiagnosisResult(abnormalities=["normal"], confidence_scores={"normal": 0.9}, findings={})
+                for _ in tensors
+            ]
+
+        mock_monai.run_inference_batch.side_effect = run_batch
+        mock_llm.format_report.return_value = ClinicalReport(findings="Test findings")
+
+        generator = ReportGenerator(
+            dicom_parser=mock_parser,
+            diagnosis_provider=mock_monai,
+            report_generator=mock_llm,
+        )
+        generator.settings = generator.settings.model_copy(update={"monai_batch_size": 1})
+        dicom_files = [b"\x00" * 128 + b"DICM" + str(i).encode() for i in range(8)]
+
+        # Act: Generate series report with one worker (window of 2 files)
+        generator.generate_report_from_dicom_series(dicom_files, max_workers=1)
+
+        # Assert: The first batch ran before the rest of the series was parsed
+        assert parsed_at_inference[0] <= 2
+        assert len(parsed_at_inference) == 8
+
+    def test_generate_report_from_dicom_series_reuses_preprocessed_files(self):
+        """Test that repeated files are served from the preprocessing cache."""
+        # Arrange: Mock pipeline
+        mock_parser = Mock(spec=DicomParserService)
+        mock_monai = Mock(spec=MonaiService)
+        mock_llm = Mock(spec=LLMService)
+
+        mock_parser.parse_dicom_file.side_effect = lambda b: DicomData(study_id="study1", instance_id=b[-1:].decode())
+        mock_parser.extract_pixel_array.return_value = Mock(size=1)
+        mock_parser.normalize_image.return_value = Mock()
+        mock_monai.preprocess_image.side_effect = lambda image: Mock()
+        mock_monai.run_inference_batch.side_effect = lambda tensors: [
+            DiagnosisResult(abnormalities=["normal"], confidence_scores={"normal": 0.9}, findings={})
+            for _ in tensors
+        ]
+        mock_llm.format_report.return_value = ClinicalReport(findings="Test findings")
+
+        generator = ReportGenerator(
+            dicom_parser=mock_parser,
+            diagnosis_provider=mock_monai,
+            report_generator=mock_llm,
+        )
+        dicom_files = [b"\x00" * 128 + b"DICM" + str(i).encode() for i in range(2)]
+
+        # Act: Generate the same series report twice
+        generator.generate_report_from_dicom_series(dicom_files)
+        result = generator.generate_report_from_dicom_series(dicom_files)
+
+        # Assert: Verify files were only parsed once and metadata is intact
+        assert mock_parser.parse_dicom_file.call_count == 2
+        assert [m["instance_id"] for m in result["image_metadata"]] == ["0", "1"]
+        assert [m["image_index"] for m in result["image_metadata"]] == [1, 2]
+
+    @patch("backend.app.services.report_generator.content_digest")
+    def test_generate_report_from_dicom_series_reuses_caller_digests(self, mock_digest):
+        """Test that digests computed by the caller are used as preprocessing cache keys."""
+        # Arrange: Mock pipeline and precomputed per-file digests
+        mock_parser = Mock(spec=DicomParserService)
+        mock_monai = Mock(spec=MonaiService)
+        mock_llm = Mock(spec=LLMService)
+
+        mock_parser.parse_dicom_file.side_effect = lambda b: DicomData(study_id="study1", instance_id=b[-1:].decode())
+        mock_parser.extract_pixel_array.return_value = Mock(size=1)
+        mock_parser.normalize_image.return_value = Mock()
+        mock_monai.preprocess_image.side_effect = lambda image: Mock()
+        mock_monai.run_inference_batch.side_effect = lambda tensors: [
+            DiagnosisResult(abnormalities=["normal"], confidence_scores={"normal": 0.9}, findings={})
+            for _ in tensors
+        ]
+        mock_llm.format_report.return_value = ClinicalReport(findings="Test findings")
+
+        generator = ReportGenerator(
+            dicom_parser=mock_parser,
+            diagnosis_provider=mock_monai,
+            report_generator=mock_llm,
+        )
+        dicom_files = [b"\x00" * 128 + b"DICM" + str(i).encode() for i in range(2)]
+        digests = [b"digest0", b"digest1"]
+
+        # Act: Generate the same series report twice with the caller's digests
+        generator.generate_report_from_dicom_series(dicom_files, digests=digests)
+        generator.generate_report_from_dicom_series(dicom_files, digests=digests)
+
+        # Assert: Files were never hashed again and the second run hit the cache
+        mock_digest.assert_not_called()
+        assert mock_parser.parse_dicom_file.call_count == 2
+
+    @patch("backend.app.services.report_generator.content_digest")
+    def test_parse_and_preprocess_file_skips_digest_when_cache_disabled(self, mock_digest):
+        """Test that files are not hashed when the preprocessing cache is disabled."""
+        # Arrange: Generator with a disabled preprocessing cache
+        mock_parser = Mock(spec=DicomParserService)
+        mock_monai = Mock(spec=MonaiService)
+        mock_parser.parse_dicom_file.return_value = DicomData(study_id="study1")
+        mock_parser.extract_pixel_array.return_value = Mock(size=1)
+        mock_monai.preprocess_image.return_value = Mock()
+
+        generator = ReportGenerator(dicom_parser=mock_parser, diagnosis_provider=mock_monai)
+        generator._preprocess_cache.maxsize = 0
+
+        # Act: Parse and preprocess a file
+        image_tensor, _, error = generator._parse_and_preprocess_file(b"\x00" * 128 + b"DICM", 0, 1)
+
+        # Assert: The file was processed without being hashed
+        assert error is None
+        assert image_tensor is not None
+        mock_digest.assert_not_called()